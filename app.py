@@ -1,24 +1,24 @@
 from flask import Flask, request, jsonify
-from models import db, Consignment, TrackingHistory, FranchExpress
-from processor import process_excel
+from models import db, Consignment, TrackingHistory, FranchExpress, Job
+from jobs import enqueue_job, start_worker_thread
+from listing import list_page, summary
+from export import export_response
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import pytz
-from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, timedelta
-import pandas as pd
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 import os
 from dotenv import load_dotenv
 
-from pdf_utils import extract_statement_entries, extract_receipt_entries
-from matcher import match_entries
 import shutil
 import uuid
+
+# Heavy dependencies are imported where they are first used, so a cold worker
+# can answer /health without loading them:
+#   ingest     -> processor / process_excel_fe (pandas, openpyxl, xlrd)
+#   reconcile  -> pdf_utils (pdfplumber), matcher
+#   reporting  -> report / mailer (smtplib, email), apscheduler
+# benchmarks/cold_start.py tracks the import time of this module.
 load_dotenv() 
 
 app = Flask(__name__)
@@ -28,154 +28,31 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 CORS(app)
 db.init_app(app)
 
+# Not in PDF extraction workers, which re-import this module as __mp_main__
+# when the app is started with `python app.py`
+if os.getenv("JOB_WORKER_IN_PROCESS") == "1" and __name__ != "__mp_main__":
+    start_worker_thread(app)
+
 # with app.app_context():
 #     db.create_all()
 IST = pytz.timezone("Asia/Kolkata")
 
-EMAIL_FROM = os.getenv("EMAIL_FROM")
-EMAIL_PASS = os.getenv("EMAIL_PASS")
-EMAIL_TO = os.getenv("EMAIL_TO")
-
 print("EMAIL_FROM:", os.getenv("EMAIL_FROM"))
 print("EMAIL_TO:", os.getenv("EMAIL_TO"))
-def send_email(subject, html_body, attachment_path=None):
-    msg = MIMEMultipart()
-    msg["From"] = EMAIL_FROM
-    msg["To"] = EMAIL_TO
-    msg["Subject"] = subject
-
-    msg.attach(MIMEText(html_body, "html"))
-
-    if attachment_path and os.path.exists(attachment_path):
-        part = MIMEBase("application", "octet-stream")
-        part.set_payload(open(attachment_path, "rb").read())
-        encoders.encode_base64(part)
-        part.add_header("Content-Disposition", f"attachment; filename={os.path.basename(attachment_path)}")
-        msg.attach(part)
-
-    server = smtplib.SMTP("smtp.gmail.com", 587)
-    server.starttls()
-    server.login(EMAIL_FROM, EMAIL_PASS)
-    server.sendmail(EMAIL_FROM, EMAIL_TO, msg.as_string())
-    server.quit()
-
-
 # -----------------------------------------------------------
 #  DAILY EMAIL DIGEST (sent at 9 AM IST)
 # -----------------------------------------------------------
 def generate_daily_report():
+    # The job worker builds the report (report.py) and delivers it through the
+    # mail outbox (mailer.py), so neither the scheduler nor a request waits on SMTP
     with app.app_context():
-        today = datetime.now(IST).date()
-        today_str = today.strftime("%d-%m-%Y")
-        print(f"Daily report sent {today}")
-
-        # Professional Courier Pending
-        professional_pending = Consignment.query.filter_by(is_delivered=False).all()
-
-        # Franch Express Pending
-        fe_pending = FranchExpress.query.filter_by(is_delivered=False).all()
-
-        if not professional_pending and not fe_pending:
-            return  # nothing to report
-
-        def build_rows(items, model_type="normal"):
-            rows = []
-            for c in items:
-                rows.append({
-                    "CNo": c.cno,
-                    "TDate": (
-                        datetime
-                            .combine(datetime.strptime(c.tdate, "%Y-%m-%d"), datetime.min.time())
-                            .astimezone(IST)
-                            .strftime("%d-%m-%Y")
-                        if c.tdate else "—"
-                    ),
-                    "Cnee": c.cnee or "—",
-                    "Pincode": c.cpincode or "—",
-                    "Destination": c.destn or "—",
-                    "Weight": c.wt or "—",
-                    "Pcs": c.pcs or "—",
-                    "Last Status": c.last_status or "—",
-                    "Last Checked": (
-                        c.last_checked.astimezone(IST).strftime("%d-%m-%Y %H:%M:%S")
-                        if c.last_checked else "—"
-                    )
-                })
-            return rows
-
-        rows_professional = build_rows(professional_pending)
-        rows_fe = build_rows(fe_pending)
-
-        # Light safe escape
-        def esc(s):
-            return (str(s)
-                    .replace("&", "&amp;")
-                    .replace("<", "&lt;")
-                    .replace(">", "&gt;"))
-
-        def create_table(rows, title):
-            if not rows:
-                return f"<p><b>No pending consignments for {title}</b></p>"
-
-            table_headers = "".join([
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>CNo</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>T-Date</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Cnee</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Pincode</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Destination</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Weight</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Pcs</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Last Status</th>",
-                "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Last Checked (IST)</th>",
-            ])
-
-            rows_html = "".join([
-                "<tr>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6;font-weight:600'>{esc(r['CNo'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['TDate'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Cnee'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Pincode'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Destination'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Weight'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Pcs'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Last Status'])}</td>" +
-                f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Last Checked'])}</td>" +
-                "</tr>"
-                for r in rows
-            ])
-
-            return f"""
-            <h3 style="margin:20px 0 10px 0;">{title} (Pending: {len(rows)})</h3>
-            <table style="border-collapse:collapse;width:100%;font-family:Arial,Helvetica,sans-serif;font-size:14px;color:#111827;background:#ffffff;border:1px solid #e5e7eb;">
-                <thead style="background:#f9fafb">
-                    <tr>{table_headers}</tr>
-                </thead>
-                <tbody>{rows_html}</tbody>
-            </table>
-            """
-
-        # Build full HTML email
-        html_body = f"""
-        <div style="font-family:Arial,Helvetica,sans-serif;color:#111827;">
-          <h2 style="margin:0 0 8px 0;">Pending Consignments Report as on {today_str}</h2>
-          
-          {create_table(rows_professional, " Professional Courier")}
-          <br/><br/>
-
-          {create_table(rows_fe, " Franch Express")}
-        </div>
-        """
-
-        send_email(
-            subject=f" Pending Consignments Report - {today_str}",
-            html_body=html_body
-        )
+        return enqueue_job("daily_report")
 
 
 @app.route("/send_daily_email", methods=["GET"])
 def manual_email():
-    generate_daily_report()
-    return jsonify({"message": "Daily email sent manually!"})
+    job = enqueue_job("daily_report")
+    return jsonify({"message": "Daily email queued", "job_id": job.id, "status": job.status}), 202
     
 @app.route("/db-check")
 def db_check():
@@ -202,9 +79,15 @@ def upload_excel():
 
     try:
         file.save(path)
-        count = process_excel(path)  # stores to DB inside
-        track_all()
-        return jsonify({"message": "Uploaded and processed", "count": count})
+
+        from excel_stream import UnsupportedFileError
+        from processor import process_excel
+        try:
+            count = process_excel(path)  # stores to DB inside
+        except UnsupportedFileError as e:
+            return jsonify({"error": str(e)}), 400
+        job = enqueue_job("track_professional")
+        return jsonify({"message": "Uploaded and processed", "count": count, "job_id": job.id})
     finally:
         try:
             if os.path.exists(path):
@@ -215,133 +98,29 @@ def upload_excel():
 
 @app.route("/track_consignments", methods=["GET"])
 def track_all():
-    from datetime import datetime
-    from tracker import get_tracking_info
-    from models import db, Consignment, TrackingHistory
-    ist = pytz.timezone("Asia/Kolkata")
-    pending = Consignment.query.filter_by(is_delivered=False).all()
-
-    for cons in pending:
-        cno = cons.cno
-
-        data = get_tracking_info(cno)
-
-        if not data:
-            continue
-
-        last_row = data[-1]
-        status = last_row["Status"].strip()
-
-        cons.last_status = status
-        cons.is_delivered = status.lower() == "delivered"
-        cons.last_checked = datetime.now(ist)
-
-        for row in data:
-
-            exists = TrackingHistory.query.filter_by(
-                consignment_id=cons.id,
-                delivery_date=row["Delivery Date"],
-                destination=row["Destination"],
-                delivery_area=row["Delivery Area"],
-                status=row["Status"],
-                drs_no=row["DRS No"],
-                stamp=row["Stamp"]
-            ).first()
-
-            if exists:
-                continue  
-
-            hist = TrackingHistory(
-                consignment_id=cons.id,
-                delivery_date=row["Delivery Date"],
-                destination=row["Destination"],
-                delivery_area=row["Delivery Area"],
-                status=row["Status"],
-                drs_no=row["DRS No"],
-                stamp=row["Stamp"],
-                scraped_at= datetime.now(ist)
-
-            )
-            db.session.add(hist)
+    job = enqueue_job("track_professional")
+    return jsonify({"job_id": job.id, "status": job.status, "summary": summary(Consignment)}), 202
 
-    db.session.commit()
 
-    consignments = Consignment.query.all()
-
-    return jsonify([
-        {
-            "cno": c.cno,
-            "status": c.last_status,
-            "delivered": c.is_delivered,
-            "last_checked": c.last_checked.isoformat() if c.last_checked else None,
-
-            # ✅ New fields
-            "tdate": c.tdate,
-            "cnee": c.cnee,
-            "cpincode": c.cpincode,
-            "destn": c.destn,
-            "wt": c.wt,
-            "pcs": c.pcs,
-        }
-        for c in consignments
-    ])
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
 @app.route("/consignments", methods=["GET"])
 def list_all():
-    consignments = Consignment.query.all()
-    return jsonify([
-        {
-            "cno": c.cno,
-            "status": c.last_status,
-            "delivered": c.is_delivered,
-            "last_checked": c.last_checked.isoformat() if c.last_checked else None,
-
-            # ✅ New fields
-            "tdate": c.tdate,
-            "cnee": c.cnee,
-            "cpincode": c.cpincode,
-            "destn": c.destn,
-            "wt": c.wt,
-            "pcs": c.pcs,
-        }
-        for c in consignments
-    ])
+    try:
+        return jsonify(list_page(Consignment, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 
 @app.route("/track_franch", methods=["GET"])
 def track_franch():
-    from tracker_franch import get_fe_tracking_info
-    ist = pytz.timezone("Asia/Kolkata")
-    pending = FranchExpress.query.filter_by(is_delivered=False).all()
-
-    for cons in pending:
-        data = get_fe_tracking_info(cons.cno)
-        if not data or data.get("status") != "success":
-            continue
-
-        details = data["data"]
-        status = details.get("dl_status_txt", "")
-
-        cons.last_status = status
-        cons.is_delivered = status.lower() == "delivered"
-        cons.last_checked = datetime.now(ist)
-
-    db.session.commit()
-
-    return jsonify([
-        {
-            "cno": c.cno,
-            "status": c.last_status,
-            "delivered": c.is_delivered,
-            "last_checked": c.last_checked.isoformat() if c.last_checked else None,
-            "tdate": c.tdate,
-            "cnee": c.cnee,
-            "cpincode": c.cpincode,
-            "destn": c.destn,
-            "wt": c.wt,
-            "pcs": c.pcs,
-        }
-        for c in FranchExpress.query.all()
-    ])
+    job = enqueue_job("track_franch")
+    return jsonify({"job_id": job.id, "status": job.status, "summary": summary(FranchExpress)}), 202
 
 @app.route("/upload_fe", methods=["POST"])
 def upload_fe():
@@ -358,11 +137,22 @@ def upload_fe():
     try:
         file.save(path)
 
+        from excel_stream import UnsupportedFileError
         from process_excel_fe import process_excel_fe
-        count = process_excel_fe(path)  # stores to DB inside
-        track_franch()
+        try:
+            counts = process_excel_fe(path)  # stores to DB inside
+        except UnsupportedFileError as e:
+            return jsonify({"error": str(e)}), 400
+        job = enqueue_job("track_franch")
 
-        return jsonify({"message": "FE Excel processed", "count": count})
+        return jsonify({
+            "message": "FE Excel processed",
+            "count": counts["inserted"],
+            "inserted": counts["inserted"],
+            "updated": counts["updated"],
+            "unchanged": counts["unchanged"],
+            "job_id": job.id,
+        })
     finally:
         try:
             if os.path.exists(path):
@@ -372,24 +162,17 @@ def upload_fe():
 
 @app.route("/fe_consignments", methods=["GET"])
 def list_all_fe():
-    consignments = FranchExpress.query.all()
-    return jsonify([
-        {
-            "cno": c.cno,
-            "status": c.last_status,
-            "delivered": c.is_delivered,
-            "last_checked": c.last_checked.isoformat() if c.last_checked else None,
-
-            # 📌 Fields from Franch Express model
-            "tdate": c.tdate,
-            "cnee": c.cnee,
-            "cpincode": c.cpincode,
-            "destn": c.destn,
-            "wt": c.wt,
-            "pcs": c.pcs,
-        }
-        for c in consignments
-    ])
+    try:
+        return jsonify(list_page(FranchExpress, request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route("/export", methods=["GET"])
+def export():
+    try:
+        return export_response(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
 @app.route("/mark_delivered/<cno>", methods=["POST"])
 def mark_delivered(cno):
@@ -400,7 +183,7 @@ def mark_delivered(cno):
 
     cons.is_delivered = True
     cons.last_status = "Delivered"
-    cons.last_checked = datetime.now(IST)
+    cons.last_checked = datetime.utcnow()
 
     db.session.commit()
 
@@ -416,7 +199,7 @@ def mark_delivered_fe(cno):
 
     cons.is_delivered = True
     cons.last_status = "Delivered"
-    cons.last_checked = datetime.now(IST)
+    cons.last_checked = datetime.utcnow()
 
     db.session.commit()
 
@@ -430,10 +213,15 @@ def reconcile():
     # ---- get files from request ----
     statement = request.files.get("statement")
     receipts = request.files.getlist("receipts")
+    mode = request.form.get("mode") or request.args.get("mode") or "greedy"
 
     if not statement or not receipts:
         return jsonify({"error": "Missing files"}), 400
 
+    from matcher import MATCH_MODES, match_entries
+    if mode not in MATCH_MODES:
+        return jsonify({"error": f"Invalid mode, expected one of: {', '.join(MATCH_MODES)}"}), 400
+
     os.makedirs(UPLOAD_DIR, exist_ok=True)
 
     saved_paths = []
@@ -446,10 +234,8 @@ def reconcile():
         statement.save(stmt_path)
         saved_paths.append(stmt_path)
 
-        statement_entries = extract_statement_entries(stmt_path)
-
-        # ---- save & extract receipts ----
-        receipt_entries = []
+        # ---- save receipts ----
+        receipt_paths = []
         for r in receipts:
             r_name = secure_filename(r.filename or "receipt.pdf")
             r_base, r_ext = os.path.splitext(r_name)
@@ -457,16 +243,23 @@ def reconcile():
             r_path = os.path.join(UPLOAD_DIR, r_unique)
             r.save(r_path)
             saved_paths.append(r_path)
-            receipt_entries.extend(extract_receipt_entries(r_path))
+            receipt_paths.append(r_path)
+
+        # ---- extract (cached by content hash; statement pages and receipts in parallel) ----
+        from pdf_utils import extract_reconcile_inputs
+        cache_stats = {}
+        statement_entries, receipt_entries = extract_reconcile_inputs(stmt_path, receipt_paths, cache_stats)
 
         # ---- match ----
-        matched, missed = match_entries(statement_entries, receipt_entries)
+        matched, missed = match_entries(statement_entries, receipt_entries, mode)
 
         return jsonify({
+            "mode": mode,
             "matched": matched,
             "missed": missed,
             "matched_count": len(matched),
-            "missed_count": len(missed)
+            "missed_count": len(missed),
+            "cache": cache_stats,
         })
     finally:
         # Always cleanup checkstatement uploads after processing / returning results
@@ -478,12 +271,24 @@ def reconcile():
                 pass
 
 
+@app.route("/reconcile/cache", methods=["GET"])
+def reconcile_cache():
+    from pdf_cache import get_cache
+    return jsonify(get_cache().stats())
+
+@app.route("/outbox", methods=["GET"])
+def outbox():
+    from mailer import outbox_summary
+    return jsonify(outbox_summary())
+
 
 
 
 
 
 if __name__ == "__main__":
+    from apscheduler.schedulers.background import BackgroundScheduler
+
     scheduler = BackgroundScheduler(timezone=IST)
     print(IST)
     scheduler.add_job(generate_daily_report, "cron", hour=9, minute=00)  # daily 9 AM IST
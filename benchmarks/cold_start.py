@@ -0,0 +1,89 @@
+"""
+Cold-start import time of the Flask app, measured with `python -X importtime`.
+
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10 --top 15
+    python -m benchmarks.cold_start --module jobs --budget-ms 800
+
+Each run imports the module in a fresh interpreter (no warm sys.modules), so
+the numbers match what a new gunicorn worker pays before it can answer
+/health. Reported per run: the cumulative import time of the module and the
+wall time of the whole process; the median is taken over --runs. The slowest
+imports of the median run are listed so regressions point at a package.
+
+With --budget-ms the exit status is 1 when the median import time exceeds
+the budget, so CI can fail on a cold-start regression. Bytecode caches are
+warmed by one discarded run first; set PYTHONDONTWRITEBYTECODE in CI only if
+you want to include compile time.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_once(module):
+    """Import `module` in a fresh interpreter; returns (wall_s, {name: (self_us, cumulative_us)})."""
+    env = dict(os.environ)
+    # app.py needs a database URL to initialise Flask-SQLAlchemy; nothing connects at import
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.pop("JOB_WORKER_IN_PROCESS", None)
+
+    t = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return wall, times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    import_once(args.module)  # warm __pycache__
+
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    totals = [times[args.module][1] / 1000 for _, times in runs]
+    walls = [wall * 1000 for wall, _ in runs]
+    median = statistics.median(totals)
+    _, times = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print(f"import {args.module}: median {median:.0f} ms (min {min(totals):.0f}, max {max(totals):.0f}) "
+          f"over {args.runs} runs; process wall {statistics.median(walls):.0f} ms")
+
+    # Top-level packages only (no dots), so one heavy dependency shows once
+    packages = sorted(((cum, name) for name, (_, cum) in times.items() if "." not in name), reverse=True)
+    print(f"\n{'cumulative (ms)':>16}  module")
+    for cum, name in packages[:args.top]:
+        print(f"{cum / 1000:>16.1f}  {name}")
+
+    heavy = [name for name in ("pandas", "pdfplumber", "apscheduler", "openpyxl", "smtplib") if name in times]
+    if heavy:
+        print(f"\nloaded at import: {', '.join(heavy)}")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"\nFAIL: median {median:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Daily digest build time and size: report.daily_report_email vs the
+original inline-styled string concatenation (kept below as
+`inline_style_report` for reference).
+
+    python -m benchmarks.daily_report
+    python -m benchmarks.daily_report --pending 2000,10000,50000 --max-rows 500
+
+Each size fills a fresh SQLite temp database with that many pending rows in
+each courier table (plus as many delivered ones, which the report skips)
+and builds the report three ways: the original, the template with every row
+in the body (--max-rows 0 disables the cap), and the template capped at
+--max-rows with the rest attached as CSV. Times are from an untraced build;
+peak memory is what tracemalloc sees allocated during a second build.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytz
+from flask import Flask
+from sqlalchemy import insert
+
+from models import db, Consignment, FranchExpress
+from report import daily_report_email
+
+IST = pytz.timezone("Asia/Kolkata")
+INSERT_BATCH = 20000
+STATUSES = ["In Transit", "Out for Delivery", "Arrived at hub", "Pickup <scheduled> & confirmed"]
+
+
+def inline_style_report():
+    """The digest before the template renderer: every pending row as ORM objects and dicts, inline styles per cell."""
+    today = datetime.now(IST).date()
+    today_str = today.strftime("%d-%m-%Y")
+
+    professional_pending = Consignment.query.filter_by(is_delivered=False).all()
+
+    fe_pending = FranchExpress.query.filter_by(is_delivered=False).all()
+
+    if not professional_pending and not fe_pending:
+        return None
+
+    def build_rows(items, model_type="normal"):
+        rows = []
+        for c in items:
+            rows.append({
+                "CNo": c.cno,
+                "TDate": (
+                    datetime
+                        .combine(datetime.strptime(c.tdate, "%Y-%m-%d"), datetime.min.time())
+                        .astimezone(IST)
+                        .strftime("%d-%m-%Y")
+                    if c.tdate else "—"
+                ),
+                "Cnee": c.cnee or "—",
+                "Pincode": c.cpincode or "—",
+                "Destination": c.destn or "—",
+                "Weight": c.wt or "—",
+                "Pcs": c.pcs or "—",
+                "Last Status": c.last_status or "—",
+                "Last Checked": (
+                    c.last_checked.astimezone(IST).strftime("%d-%m-%Y %H:%M:%S")
+                    if c.last_checked else "—"
+                )
+            })
+        return rows
+
+    rows_professional = build_rows(professional_pending)
+    rows_fe = build_rows(fe_pending)
+
+    # Light safe escape
+    def esc(s):
+        return (str(s)
+                .replace("&", "&amp;")
+                .replace("<", "&lt;")
+                .replace(">", "&gt;"))
+
+    def create_table(rows, title):
+        if not rows:
+            return f"<p><b>No pending consignments for {title}</b></p>"
+
+        table_headers = "".join([
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>CNo</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>T-Date</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Cnee</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Pincode</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Destination</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Weight</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Pcs</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Last Status</th>",
+            "<th style='text-align:left;padding:8px;border-bottom:1px solid #e5e7eb;'>Last Checked (IST)</th>",
+        ])
+
+        rows_html = "".join([
+            "<tr>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6;font-weight:600'>{esc(r['CNo'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['TDate'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Cnee'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Pincode'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Destination'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Weight'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Pcs'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Last Status'])}</td>" +
+            f"<td style='padding:8px;border-bottom:1px solid #f3f4f6'>{esc(r['Last Checked'])}</td>" +
+            "</tr>"
+            for r in rows
+        ])
+
+        return f"""
+        <h3 style="margin:20px 0 10px 0;">{title} (Pending: {len(rows)})</h3>
+        <table style="border-collapse:collapse;width:100%;font-family:Arial,Helvetica,sans-serif;font-size:14px;color:#111827;background:#ffffff;border:1px solid #e5e7eb;">
+            <thead style="background:#f9fafb">
+                <tr>{table_headers}</tr>
+            </thead>
+            <tbody>{rows_html}</tbody>
+        </table>
+        """
+
+    # Build full HTML email
+    html_body = f"""
+    <div style="font-family:Arial,Helvetica,sans-serif;color:#111827;">
+      <h2 style="margin:0 0 8px 0;">Pending Consignments Report as on {today_str}</h2>
+      
+      {create_table(rows_professional, " Professional Courier")}
+      <br/><br/>
+
+      {create_table(rows_fe, " Franch Express")}
+    </div>
+    """
+
+    return html_body
+
+
+def populate(model, pending, prefix):
+    rnd = random.Random(pending)
+    start = datetime(2026, 1, 1)
+    rows = []
+    for i in range(pending * 2):
+        rows.append({
+            "cno": f"{prefix}{i:09d}",
+            "tdate": (start + timedelta(days=rnd.randrange(60))).strftime("%Y-%m-%d"),
+            "cnee": f"Consignee {rnd.randrange(5000)}",
+            "cpincode": str(600000 + rnd.randrange(1000)),
+            "destn": rnd.choice(["CHENNAI", "MADURAI", "COIMBATORE", "SALEM"]),
+            "wt": f"{rnd.randrange(1, 40) / 2}",
+            "pcs": str(rnd.randrange(1, 5)),
+            "last_status": rnd.choice(STATUSES),
+            "is_delivered": i % 2 == 1,
+            "last_checked": start + timedelta(minutes=rnd.randrange(90 * 24 * 60)),
+        })
+        if len(rows) == INSERT_BATCH:
+            db.session.execute(insert(model), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(model), rows)
+    db.session.commit()
+
+
+def measure(fn):
+    """Time one untraced build, then take peak memory from a second, traced one."""
+    db.session.expunge_all()
+    t = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - t
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def run(pending, max_rows):
+    tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    tmp.close()
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp.name}"
+    db.init_app(app)
+    try:
+        with app.app_context():
+            tables = [Consignment.__table__, FranchExpress.__table__]
+            db.metadata.create_all(db.engine, tables=tables)
+            populate(Consignment, pending, "MAA")
+            populate(FranchExpress, pending, "FE")
+
+            results = []
+            seconds, peak, html = measure(inline_style_report)
+            results.append(("original", seconds, peak, len(html), 0))
+            for label, limit in (("template", max(pending, 1)), (f"capped {max_rows}", max_rows)):
+                if limit <= 0:
+                    continue
+                seconds, peak, (_, html, attachments) = measure(lambda: daily_report_email(limit))
+                results.append((label, seconds, peak, len(html), sum(len(a[1]) for a in attachments)))
+            db.engine.dispose()
+        return results
+    finally:
+        os.unlink(tmp.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pending", default="2000,10000")
+    parser.add_argument("--max-rows", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'pending':>8} | {'renderer':>12} | {'ms':>8} | {'peak MB':>8} | {'HTML KB':>8} | {'CSV KB':>7}")
+    for pending in map(int, args.pending.split(",")):
+        for label, seconds, peak, html_bytes, csv_bytes in run(pending, args.max_rows):
+            print(f"{pending:>8,} | {label:>12} | {seconds * 1000:>8.0f} | {peak / 2 ** 20:>8.1f} "
+                  f"| {html_bytes / 1024:>8.0f} | {csv_bytes / 1024:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
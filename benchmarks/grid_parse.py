@@ -0,0 +1,86 @@
+"""
+Parse time for the tpcindia results page: lxml/XPath parser vs the
+BeautifulSoup walk it replaced (both in grid_parser.py).
+
+    python -m benchmarks.grid_parse
+    python -m benchmarks.grid_parse --rows 1,10,100 --repeat 50
+    python -m benchmarks.grid_parse --pages saved_pages/*.html
+
+By default the fixtures are synthetic result pages shaped like the real one:
+an ASP.NET form with a large __VIEWSTATE, navigation chrome, and a GridView1
+table with the requested number of rows. --pages times saved copies of real
+responses instead. Every fixture is also checked for identical output from
+both parsers.
+"""
+import argparse
+import base64
+import html
+import random
+import time
+
+from grid_parser import GRID_ID, LABEL_ID, parse_results_lxml, parse_results_soup
+
+HEADERS = ["CONSIGNMENT NO.", "Delivery Date", "Destination", "Delivery Area", "Status", "DRS No", "Stamp"]
+STATUSES = ["In Transit", "Out for delivery", "Delivered", "Arrived at hub"]
+VIEWSTATE_BYTES = 60 * 1024
+
+
+def synthetic_page(n_rows, seed=0):
+    rnd = random.Random(seed)
+    viewstate = base64.b64encode(rnd.randbytes(VIEWSTATE_BYTES)).decode()
+    nav = "".join(f'<li><a href="/page{i}.aspx" class="nav">Menu item {i}</a></li>' for i in range(150))
+    head = "".join(f'<th scope="col">{h}</th>' for h in HEADERS)
+    rows = []
+    for i in range(n_rows):
+        cells = [f"MAA{rnd.randrange(10 ** 9):09d}", f"{rnd.randint(1, 28):02d}/10/2026",
+                 "CHENNAI", " GUINDY&nbsp;", rnd.choice(STATUSES), f"DRS{i}", "<span>stamp</span>"]
+        style = ' style="background-color:#EFF3FB;"' if i % 2 else ""
+        rows.append(f"<tr{style}>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    return f"""<!DOCTYPE html>
+<html><head><title>Multiple Tracking</title><link rel="stylesheet" href="/site.css" /></head>
+<body><form method="post" action="./multiple-tracking.aspx" id="form1">
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{html.escape(viewstate)}" />
+<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="4E8B2B7C" />
+<div id="header"><ul class="menu">{nav}</ul></div>
+<div class="content"><span id="{LABEL_ID}"></span>
+<div><table cellspacing="0" rules="all" border="1" id="{GRID_ID}" style="border-collapse:collapse;">
+<tr>{head}</tr>{"".join(rows)}
+</table></div></div>
+<div id="footer">{"<p>Footer text</p>" * 50}</div>
+</form></body></html>"""
+
+
+def timed(fn, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1,10,100", help="grid sizes for the synthetic pages")
+    parser.add_argument("--pages", nargs="*", help="saved result pages to time instead")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.pages:
+        fixtures = []
+        for path in args.pages:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                fixtures.append((path, f.read()))
+    else:
+        fixtures = [(f"{n} rows", synthetic_page(n, seed=n)) for n in map(int, args.rows.split(","))]
+
+    print(f"{'page':>24} | {'KB':>6} | {'soup (ms)':>10} | {'lxml (ms)':>10} | {'speedup':>7}")
+    for name, page in fixtures:
+        assert parse_results_lxml(page) == parse_results_soup(page), f"parsers disagree on {name}"
+        soup = timed(parse_results_soup, page, args.repeat)
+        fast = timed(parse_results_lxml, page, args.repeat)
+        print(f"{name[-24:]:>24} | {len(page) / 1024:>6.0f} | {soup * 1000:>10.2f} | {fast * 1000:>10.2f} | {soup / fast:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Statement-to-receipt matching time: matcher.match_entries in greedy and
+optimal mode vs the original nested loop (kept below as `nested_loop_match`
+for reference).
+
+    python -m benchmarks.matching
+    python -m benchmarks.matching --sizes 1000,10000 --nested-max 3000
+    python -m benchmarks.matching --amounts 20    # few distinct amounts, large buckets
+
+Each size generates that many statement entries and receipts over one
+month. Amounts repeat (round figures like 500.00 are common in practice)
+and receipt dates drift up to 3 days from their deposit, so buckets hold
+several candidates and some entries fall outside the window. The nested
+loop is quadratic, so it only runs (and its output is only compared) for
+sizes up to --nested-max. The last column is how many more entries optimal
+mode matches than greedy.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from matcher import match_entries, parse_statement_date, parse_receipt_date, date_diff
+
+START = date(2026, 1, 1)
+DAYS = 31
+
+
+def nested_loop_match(statement, receipts):
+    """The matcher before indexing: every entry scans every receipt."""
+    matched = []
+    missed = []
+    used_receipts = set()
+    for stmt in statement:
+        stmt_date = parse_statement_date(stmt["date"])
+        found_match = None
+        for idx, rcp in enumerate(receipts):
+            if idx in used_receipts:
+                continue
+            rcp_date = parse_receipt_date(rcp["date"])
+            if stmt["amount"] == rcp["amount"] and date_diff(stmt_date, rcp_date) <= 2:
+                found_match = rcp
+                used_receipts.add(idx)
+                break
+        if found_match:
+            matched.append({"statement": stmt, "receipt": found_match})
+        else:
+            missed.append(stmt)
+    return matched, missed
+
+
+def generate(n, seed=0, distinct_amounts=None):
+    rnd = random.Random(seed)
+    distinct_amounts = distinct_amounts or max(10, n // 4)
+    amounts = [float(a) for a in range(100, 100 + distinct_amounts * 50, 50)]
+    statement, receipts = [], []
+    for i in range(n):
+        day = START + timedelta(days=rnd.randrange(DAYS))
+        amount = rnd.choice(amounts)
+        statement.append({
+            "date": day.strftime("%d/%m/%Y") + " 10:15:00",
+            "description": f"NEFT CR {i}",
+            "amount": amount,
+        })
+        # Most deposits have a receipt a day or so either side; some drift out of range
+        rday = day + timedelta(days=rnd.randint(-3, 3))
+        receipts.append({
+            "date": rday.strftime("%d-%b-%y"),
+            "party": f"PARTY {i}",
+            "amount": amount if rnd.random() < 0.9 else rnd.choice(amounts),
+        })
+    rnd.shuffle(receipts)
+    return statement, receipts
+
+
+def timed(fn, *args):
+    t = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--nested-max", type=int, default=3000)
+    parser.add_argument("--amounts", type=int, default=None, help="distinct amounts (default: entries / 4)")
+    args = parser.parse_args()
+
+    print(f"{'entries':>9} | {'greedy (ms)':>12} | {'optimal (ms)':>13} | {'nested loop (ms)':>17} "
+          f"| {'matched':>8} | {'missed':>7} | {'optimal +':>9}")
+    for n in map(int, args.sizes.split(",")):
+        statement, receipts = generate(n, seed=n, distinct_amounts=args.amounts)
+        fast, (matched, missed) = timed(match_entries, statement, receipts)
+        best, (optimal_matched, _) = timed(match_entries, statement, receipts, "optimal")
+
+        slow = "skipped"
+        if n <= args.nested_max:
+            seconds, expected = timed(nested_loop_match, statement, receipts)
+            assert (matched, missed) == expected, f"results differ at {n} entries"
+            slow = f"{seconds * 1000:.0f}"
+
+        print(f"{n:>9,} | {fast * 1000:>12.1f} | {best * 1000:>13.1f} | {slow:>17} "
+              f"| {len(matched):>8,} | {len(missed):>7,} | {len(optimal_matched) - len(matched):>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+/reconcile extraction time (statement + receipts) by worker count.
+
+    python -m benchmarks.pdf_extract
+    python -m benchmarks.pdf_extract --pages 80 --receipts 200 --workers 1,2,4,8
+
+Builds a synthetic ruled statement and single-page receipts (see
+benchmarks/pdf_fixtures.py) in a temp directory, then runs
+pdf_utils.extract_reconcile_inputs with PDF_WORKERS set to each count.
+Results are checked to be identical to the serial run. The first parallel
+run includes starting the worker processes; the pool is reused after that,
+as it is in the web process, so the best of --repeat runs is reported.
+The pdf_cache is switched off for the run, so every repeat and every
+worker count really extracts instead of reading the previous run's result.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pdf_utils
+from pdf_cache import get_cache
+from benchmarks.pdf_fixtures import write_receipt_pdf, write_statement_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--receipts", type=int, default=100)
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count() or 1}")
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    get_cache().max_bytes = 0  # disabled: measure extraction, not cache hits
+
+    with tempfile.TemporaryDirectory() as tmp:
+        statement = os.path.join(tmp, "statement.pdf")
+        write_statement_pdf(statement, args.pages)
+        receipts = []
+        for i in range(args.receipts):
+            receipts.append(os.path.join(tmp, f"receipt_{i}.pdf"))
+            write_receipt_pdf(receipts[-1], seed=i)
+
+        print(f"statement: {args.pages} pages, receipts: {args.receipts}")
+        print(f"{'workers':>8} | {'seconds':>8} | {'speedup':>7}")
+        baseline = expected = None
+        for workers in sorted({int(w) for w in args.workers.split(",")}):
+            pdf_utils.shutdown_pool()
+            pdf_utils.PDF_WORKERS = workers
+            best = float("inf")
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                entries, receipt_entries = pdf_utils.extract_reconcile_inputs(statement, receipts)
+                result = list(entries), list(receipt_entries)
+                best = min(best, time.perf_counter() - t)
+            if expected is None:
+                expected, baseline = result, best
+            assert result == expected, f"results differ with {workers} workers"
+            print(f"{workers:>8} | {best:>8.2f} | {baseline / best:>6.1f}x")
+        pdf_utils.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Synthetic bank statement and receipt PDFs for the extraction benchmarks.
+
+Written by hand (no PDF library needed): statements are ruled tables that
+pdfplumber's extract_table() picks up with the same column layout the real
+statements have (date in column 1, description in 3, deposit in 6);
+receipts are text lines matching the receipt regex in pdf_utils, optionally
+with some rows drawn amount first (out of reading order in the content
+stream, as some generators do).
+"""
+import random
+from datetime import date, timedelta
+
+STATEMENT_HEADER = ["Sl", "Txn Date", "Value Date", "Description", "Ref No", "Withdrawal", "Deposit", "Balance"]
+COLUMN_X = [30, 55, 125, 190, 370, 430, 480, 530, 585]
+ROW_HEIGHT = 16
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, page_streams):
+    """Write a PDF whose pages have the given content streams (Helvetica as /F1)."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for stream in page_streams:
+        data = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(data), data))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, content_ref)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for num, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (num, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for off in offsets:
+            f.write(b"%010d 00000 n \n" % off)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+
+def table_stream(rows):
+    """A ruled table, one text cell per column, top of the page down."""
+    top = PAGE_HEIGHT - 40
+    bottom = top - ROW_HEIGHT * len(rows)
+    out = ["0.5 w"]
+    for r in range(len(rows) + 1):
+        y = top - r * ROW_HEIGHT
+        out.append(f"{COLUMN_X[0]} {y} m {COLUMN_X[-1]} {y} l S")
+    for x in COLUMN_X:
+        out.append(f"{x} {top} m {x} {bottom} l S")
+    for r, row in enumerate(rows):
+        y = top - (r + 1) * ROW_HEIGHT + 5
+        for c, cell in enumerate(row):
+            out.append(f"BT /F1 6 Tf {COLUMN_X[c] + 2} {y} Td ({_escape(cell)}) Tj ET")
+    return "\n".join(out)
+
+
+def statement_rows(n, rnd, start=date(2026, 1, 1)):
+    rows = []
+    for i in range(n):
+        day = start + timedelta(days=rnd.randrange(31))
+        deposit = f"{rnd.randrange(100, 50000, 50):,}.00" if rnd.random() < 0.7 else ""
+        withdrawal = "" if deposit else f"{rnd.randrange(100, 9000, 50):,}.00"
+        rows.append([str(i + 1), day.strftime("%d/%m/%Y") + " 10:15:00", day.strftime("%d/%m/%Y"),
+                     f"NEFT CR-{rnd.randrange(10 ** 6)}-PARTY {i}", f"R{i:07d}",
+                     withdrawal, deposit, f"{rnd.randrange(10 ** 6):,}.00"])
+    return rows
+
+
+def write_statement_pdf(path, pages, rows_per_page=40, seed=0):
+    rnd = random.Random(seed)
+    streams = [table_stream([STATEMENT_HEADER] + statement_rows(rows_per_page, rnd)) for _ in range(pages)]
+    write_pdf(path, streams)
+
+
+def receipt_stream(lines):
+    """Lines top down; a line is a string, or [(x, text), ...] runs drawn in that order."""
+    out = []
+    y = PAGE_HEIGHT - 60
+    for line in lines:
+        runs = [(50, line)] if isinstance(line, str) else line
+        for x, text in runs:
+            out.append(f"BT /F1 10 Tf {x} {y} Td ({_escape(text)}) Tj ET")
+        y -= 14
+    return "\n".join(out)
+
+
+def write_receipt_pdf(path, entries=3, pages=1, seed=0, out_of_order=0):
+    """`out_of_order` rows per page draw their amount before the date and party."""
+    rnd = random.Random(seed)
+    streams = []
+    for _ in range(pages):
+        lines = ["RECEIPT", "Date        Party        Amount"]
+        for k in range(entries):
+            day = date(2026, 1, 1) + timedelta(days=rnd.randrange(31))
+            left = f"{day.strftime('%d-%b-%y')}  Party {rnd.randrange(1000)} Traders"
+            amount = f"{rnd.randrange(100, 50000, 50):,}.00"
+            lines.append([(400, amount), (50, left)] if k < out_of_order else f"{left}  {amount}")
+        lines.append("Thank you")
+        streams.append(receipt_stream(lines))
+    write_pdf(path, streams)
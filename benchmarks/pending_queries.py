@@ -0,0 +1,149 @@
+"""
+Query time for the pending-consignment scan and tracking-history lookups,
+with and without the indexes declared in models.py.
+
+    python -m benchmarks.pending_queries
+    python -m benchmarks.pending_queries --sizes 10000,100000 --database-url postgresql://...
+
+Each size builds a fresh schema (SQLite temp file by default) with
+PENDING_RATIO of consignments pending and HISTORY_PER_CONSIGNMENT events each.
+Only point --database-url at a scratch database: the consignment and
+tracking_history tables there are dropped and recreated.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import insert, text
+
+from models import db, Consignment, TrackingHistory
+
+PENDING_RATIO = 0.05
+HISTORY_PER_CONSIGNMENT = 3
+LOOKUPS = 200
+INSERT_BATCH = 20000
+
+INDEXES = [
+    "ix_consignment_pending",
+    "ix_tracking_history_consignment_scraped",
+    "uq_tracking_history_event",
+]
+
+
+def populate(n):
+    rnd = random.Random(n)
+    start = datetime(2025, 1, 1)
+    for lo in range(0, n, INSERT_BATCH):
+        hi = min(n, lo + INSERT_BATCH)
+        db.session.execute(insert(Consignment), [
+            {"id": i + 1, "cno": f"MAA{i:09d}", "tdate": "2025-01-01",
+             "is_delivered": rnd.random() >= PENDING_RATIO}
+            for i in range(lo, hi)
+        ])
+        db.session.execute(insert(TrackingHistory), [
+            {"consignment_id": i + 1, "status": f"Event {k}",
+             "event_hash": f"{i}-{k}", "scraped_at": start + timedelta(hours=k)}
+            for i in range(lo, hi) for k in range(HISTORY_PER_CONSIGNMENT)
+        ])
+        db.session.commit()
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def measure(n):
+    rnd = random.Random(1)
+    ids = [rnd.randint(1, n) for _ in range(LOOKUPS)]
+
+    def pending_scan():
+        db.session.query(Consignment.id, Consignment.cno).filter_by(is_delivered=False).all()
+
+    def history_lookups():
+        for cid in ids:
+            (db.session.query(TrackingHistory.status)
+             .filter_by(consignment_id=cid)
+             .order_by(TrackingHistory.scraped_at)
+             .all())
+
+    return timed(pending_scan), timed(history_lookups)
+
+
+def drop_indexes():
+    for name in INDEXES:
+        db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    db.session.commit()
+
+
+def create_indexes():
+    for model in (Consignment, TrackingHistory):
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def run(n, database_url=None):
+    tmp = None
+    if not database_url:
+        tmp = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        tmp.close()
+        database_url = f"sqlite:///{tmp.name}"
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    db.init_app(app)
+    try:
+        with app.app_context():
+            tables = [Consignment.__table__, TrackingHistory.__table__]
+            db.metadata.drop_all(db.engine, tables=tables)
+            db.metadata.create_all(db.engine, tables=tables)
+            t = time.perf_counter()
+            populate(n)
+            print(f"  populated {n:,} consignments in {time.perf_counter() - t:.1f}s")
+
+            drop_indexes()
+            without = measure(n)
+            create_indexes()
+            with_idx = measure(n)
+
+            if tmp is None:
+                db.metadata.drop_all(db.engine, tables=tables)
+            db.engine.dispose()
+        return without, with_idx
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    results = []
+    for n in [int(s) for s in args.sizes.split(",")]:
+        print(f"{n:,} consignments")
+        results.append((n, *run(n, args.database_url)))
+
+    print()
+    print(f"{'rows':>10} | {'pending scan (ms)':>24} | {f'{LOOKUPS} history lookups (ms)':>28}")
+    print(f"{'':>10} | {'no index':>11} {'indexed':>12} | {'no index':>13} {'indexed':>14}")
+    for n, (scan0, hist0), (scan1, hist1) in results:
+        print(f"{n:>10,} | {scan0 * 1000:>11.1f} {scan1 * 1000:>12.1f} | {hist0 * 1000:>13.1f} {hist1 * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
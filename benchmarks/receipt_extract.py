@@ -0,0 +1,80 @@
+"""
+Receipt extraction time: the text-layer fast path in pdf_utils vs
+pdfplumber's layout-aware extract_text(), which is also the fallback.
+
+    python -m benchmarks.receipt_extract
+    python -m benchmarks.receipt_extract --receipts 200 --pages 1,3 --entries 10
+
+Writes synthetic receipts (see benchmarks/pdf_fixtures.py) with the given
+pages each and times extracting all of them both ways. Both must give the
+same entries; "first page" is the old extraction, which read page 1 only,
+so it misses the entries on later pages.
+
+Each size is run twice: in order, and with --out-of-order rows per page
+drawn amount first. The fast path can't read those rows, so the pages
+holding them must be re-read layout-aware and still give every entry.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pdf_utils
+from benchmarks.pdf_fixtures import write_receipt_pdf
+
+
+def first_page_entries(path):
+    """Receipt extraction before the fast path: layout-aware text of page 1 only."""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        lines = pdf.pages[0].extract_text().split("\n")
+    return pdf_utils.receipt_line_entries(lines)
+
+
+def layout_entries(path):
+    return pdf_utils.receipt_line_entries(pdf_utils.layout_text_lines(path))
+
+
+def timed(fn, paths):
+    t = time.perf_counter()
+    entries = [fn(path) for path in paths]
+    return time.perf_counter() - t, entries
+
+
+def run(tmp, pages, out_of_order, args):
+    paths = []
+    for i in range(args.receipts):
+        paths.append(os.path.join(tmp, f"receipt_{pages}_{out_of_order}_{i}.pdf"))
+        write_receipt_pdf(paths[-1], entries=args.entries, pages=pages, seed=i, out_of_order=out_of_order)
+
+    first, first_found = timed(first_page_entries, paths)
+    layout, expected = timed(layout_entries, paths)
+    fast, found = timed(pdf_utils.extract_receipt_entries, paths)
+    assert found == expected, f"entries differ at {pages} pages, {out_of_order} out of order"
+    assert sum(map(len, found)) == args.receipts * pages * args.entries, "entries dropped"
+
+    n = args.receipts
+    rows = f"{out_of_order} unordered" if out_of_order else "in order"
+    print(f"{pages:>6} | {rows:>12} | {first / n * 1000:>15.2f} | {layout / n * 1000:>12.2f} | {fast / n * 1000:>10.2f} "
+          f"| {layout / fast:>6.1f}x | {sum(map(len, found)):>8,} | {sum(map(len, first_found)):>10,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--receipts", type=int, default=100)
+    parser.add_argument("--pages", default="1,3")
+    parser.add_argument("--entries", type=int, default=5, help="entries per page")
+    parser.add_argument("--out-of-order", type=int, default=1, help="rows per page drawn amount first")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} | {'rows':>12} | {'first page (ms)':>15} | {'layout (ms)':>12} | {'fast (ms)':>10} "
+          f"| {'speedup':>7} | {'entries':>8} | {'first page':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in map(int, args.pages.split(",")):
+            for out_of_order in (0, args.out_of_order):
+                run(tmp, pages, out_of_order, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Peak memory of reading a long statement: every page held open (the
+extraction before streaming) vs pdf_utils.iter_statement_entries, which
+closes each page once its table is read.
+
+    python -m benchmarks.statement_memory
+    python -m benchmarks.statement_memory --pages 50,300
+
+Builds a synthetic ruled statement per size (see benchmarks/pdf_fixtures.py)
+and runs each mode in a fresh interpreter, so the peak RSS reported is that
+run's alone. Both modes feed matcher.match_entries and must give the same
+matched/missed counts. "imports" is the interpreter with pdfplumber and
+the matcher loaded, before any PDF is opened.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("imports", "all pages", "streamed")
+
+
+def all_pages_entries(path):
+    """Statement extraction before streaming: pages stay open until the PDF closes."""
+    import pdfplumber
+    from pdf_utils import statement_table_entries
+
+    entries = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            table = page.extract_table()
+            if table:
+                entries.extend(statement_table_entries(table))
+    return entries
+
+
+def child(mode, path):
+    import pdf_utils
+    from matcher import match_entries
+
+    t = time.perf_counter()
+    matched = missed = []
+    if mode == "all pages":
+        matched, missed = match_entries(all_pages_entries(path), [])
+    elif mode == "streamed":
+        matched, missed = match_entries(pdf_utils.iter_statement_entries(path), [])
+    seconds = time.perf_counter() - t
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print(f"{peak_kb} {seconds:.3f} {len(matched)} {len(missed)}")
+
+
+def measure(mode, path):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.statement_memory", "--child", mode, path],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return int(out[0]) / 1024, float(out[1]), (int(out[2]), int(out[3]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="50,200")
+    parser.add_argument("--rows-per-page", type=int, default=40)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    from benchmarks.pdf_fixtures import write_statement_pdf
+
+    print(f"{'pages':>6} | {'mode':>10} | {'peak RSS (MB)':>13} | {'seconds':>8} | {'entries':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in map(int, args.pages.split(",")):
+            path = os.path.join(tmp, f"statement_{pages}.pdf")
+            write_statement_pdf(path, pages, rows_per_page=args.rows_per_page)
+            results = {}
+            for mode in MODES:
+                peak, seconds, counts = measure(mode, path)
+                results[mode] = counts
+                entries = "" if mode == "imports" else f"{sum(counts):,}"
+                print(f"{pages:>6,} | {mode:>10} | {peak:>13.1f} | {seconds:>8.2f} | {entries:>8}")
+            assert results["all pages"] == results["streamed"], f"results differ at {pages} pages"
+
+
+if __name__ == "__main__":
+    main()
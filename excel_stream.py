@@ -0,0 +1,147 @@
+"""
+Chunked reading of uploaded manifests.
+
+read_sheet_chunks() yields DataFrames of at most INGEST_CHUNK_ROWS rows with
+every cell as a string (the same shape pd.read_excel(path, dtype=str) gives),
+so the ingest code can validate and upsert chunk by chunk. Files under
+INGEST_STREAM_THRESHOLD_MB are read in one go; larger ones are streamed:
+
+- .xlsx: openpyxl read-only mode, rows pulled lazily from the sheet XML
+- .xls:  xlrd with on_demand sheet loading (the format caps a sheet at 65,536
+         rows, so the workbook itself stays small)
+- .csv:  pandas' chunked CSV reader
+
+Anything else (a PDF, an image, a renamed binary) raises UnsupportedFileError
+before a single row is read.
+"""
+import codecs
+import os
+from datetime import date, datetime
+
+import pandas as pd
+
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "5000"))
+INGEST_STREAM_THRESHOLD_MB = float(os.getenv("INGEST_STREAM_THRESHOLD_MB", "5"))
+
+XLSX_MAGIC = b"PK\x03\x04"
+XLS_MAGIC = b"\xd0\xcf\x11\xe0"
+PDF_MAGIC = b"%PDF"  # plain ASCII, but never a manifest
+SNIFF_BYTES = 8192
+
+
+class UnsupportedFileError(ValueError):
+    pass
+
+
+def looks_like_text(head):
+    if b"\x00" in head:
+        return False
+    try:
+        # Not final: the sample may end part-way through a multi-byte character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def sniff_format(path):
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    if head[:4] == XLSX_MAGIC:
+        return "xlsx"
+    if head[:4] == XLS_MAGIC:
+        return "xls"
+    if looks_like_text(head) and not head.startswith(PDF_MAGIC):
+        return "csv"
+    raise UnsupportedFileError("Unsupported file: expected an .xlsx, .xls or UTF-8 .csv manifest")
+
+
+def cell_str(value):
+    """Render a cell the way read_excel(dtype=str) does; blanks become None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime, date)):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def make_header(values):
+    header, seen = [], {}
+    for i, v in enumerate(values):
+        name = cell_str(v) or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        header.append(name)
+    return header
+
+
+def frames_from_rows(rows, chunk_rows):
+    """Group an iterator of row tuples (header first) into string DataFrames."""
+    rows = iter(rows)
+    try:
+        header = make_header(next(rows))
+    except StopIteration:
+        return
+
+    batch = []
+    for row in rows:
+        values = [cell_str(v) for v in row[:len(header)]]
+        if not any(v is not None for v in values):
+            continue
+        values += [None] * (len(header) - len(values))
+        batch.append(values)
+        if len(batch) >= chunk_rows:
+            yield pd.DataFrame(batch, columns=header, dtype=object)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=header, dtype=object)
+
+
+def iter_xlsx_rows(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_xls_rows(path):
+    import xlrd
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        for r in range(sheet.nrows):
+            row = []
+            for cell in sheet.row(r):
+                if cell.ctype == xlrd.XL_CELL_DATE:
+                    row.append(xlrd.xldate.xldate_as_datetime(cell.value, book.datemode))
+                elif cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                    row.append(None)
+                else:
+                    row.append(cell.value)
+            yield row
+    finally:
+        book.release_resources()
+
+
+def read_sheet_chunks(path, chunk_rows=INGEST_CHUNK_ROWS, threshold_mb=INGEST_STREAM_THRESHOLD_MB):
+    fmt = sniff_format(path)
+
+    if fmt == "csv":
+        yield from pd.read_csv(path, dtype=str, chunksize=chunk_rows)
+        return
+
+    if os.path.getsize(path) < threshold_mb * 1024 * 1024:
+        yield pd.read_excel(path, dtype=str)
+        return
+
+    rows = iter_xlsx_rows(path) if fmt == "xlsx" else iter_xls_rows(path)
+    yield from frames_from_rows(rows, chunk_rows)
@@ -0,0 +1,120 @@
+"""
+Streaming export of the consignment tables as NDJSON, CSV or XLSX.
+
+Rows are pulled from a server-side cursor (yield_per) and written out as they
+arrive, so memory stays flat however large the table is. NDJSON and CSV start
+sending immediately; XLSX is a zip archive that can only be finalised at the
+end, so rows are streamed into a write-only workbook on disk and the file is
+sent once complete.
+
+Accepts the same filters and `fields` projection as the listing endpoints.
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from flask import Response, stream_with_context
+
+from listing import FIELDS, apply_filters, parse_fields
+from models import db, Consignment, FranchExpress
+
+EXPORT_TABLES = {
+    "consignments": Consignment,
+    "fe_consignments": FranchExpress,
+}
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+YIELD_PER = 1000
+FLUSH_BYTES = 64 * 1024
+
+
+def export_value(v):
+    if isinstance(v, datetime):
+        # Stored as naive UTC; written with its offset, as the listing endpoints do
+        return v.replace(tzinfo=timezone.utc).isoformat()
+    return v
+
+
+def iter_rows(query):
+    for row in query.yield_per(YIELD_PER):
+        yield [export_value(v) for v in row]
+
+
+def ndjson_chunks(rows, fields):
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+        buf.write("\n")
+        if buf.tell() >= FLUSH_BYTES:
+            yield buf.getvalue()
+            buf = io.StringIO()
+    yield buf.getvalue()
+
+
+def csv_chunks(rows, fields):
+    buf = io.StringIO()
+    buf.write("\ufeff")  # BOM so Excel opens it as UTF-8
+    writer = csv.writer(buf)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= FLUSH_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def xlsx_chunks(rows, fields):
+    from openpyxl import Workbook
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Export")
+        ws.append(fields)
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(FLUSH_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def export_response(args):
+    """Build the streaming Response for /export; raises ValueError on bad parameters."""
+    table = args.get("table", "consignments")
+    fmt = args.get("format", "ndjson").lower()
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+
+    model = EXPORT_TABLES[table]
+    fields = parse_fields(args)
+    writer = {"ndjson": ndjson_chunks, "csv": csv_chunks, "xlsx": xlsx_chunks}[fmt]
+
+    # Filters are applied before streaming starts so bad parameters still get a 400
+    columns = [getattr(model, FIELDS[f]) for f in fields]
+    query = apply_filters(db.session.query(*columns), model, args).order_by(model.id)
+
+    body = writer(iter_rows(query), fields)
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={table}.{fmt}"},
+    )
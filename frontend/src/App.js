@@ -37,6 +37,37 @@ export default function App() {
 
 
 
+// -----------------------------------------------------
+// ✅ BACKGROUND JOBS (tracking refresh runs on the server)
+// -----------------------------------------------------
+// Gives up after timeoutMs (the server fails a job stuck that long, see JOB_TIMEOUT_SECONDS)
+async function waitForJob(jobId, intervalMs = 2000, timeoutMs = 60 * 60 * 1000) {
+  const deadline = Date.now() + timeoutMs;
+  let job = null;
+  while (Date.now() < deadline) {
+    const res = await fetch(`https://backend-ktuk.onrender.com/jobs/${jobId}`);
+    job = await res.json();
+    if (!res.ok || job.status === "done" || job.status === "failed") return job;
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+  return job;
+}
+
+// Walk the keyset-paginated listing endpoints until the last page
+async function fetchAllPages(path, pageSize = 5000) {
+  let items = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: pageSize });
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`https://backend-ktuk.onrender.com${path}?${params}`);
+    const page = await res.json();
+    items = items.concat(page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
+
 // -----------------------------------------------------
 // ✅ TRACKING PAGE
 // -----------------------------------------------------
@@ -91,8 +122,7 @@ function TrackPage() {
   const [trackingAll, setTrackingAll] = useState(false);
 
   const loadData = async () => {
-    const res = await fetch("https://backend-ktuk.onrender.com/consignments");
-    const d = await res.json();
+    const d = await fetchAllPages("/consignments");
 
     const cleaned = d.map(item => ({
       ...item,
@@ -121,7 +151,9 @@ function TrackPage() {
 
   const trackAll = async () => {
     setTrackingAll(true);
-    await fetch("https://backend-ktuk.onrender.com/track_consignments");
+    const res = await fetch("https://backend-ktuk.onrender.com/track_consignments");
+    const { job_id } = await res.json();
+    await waitForJob(job_id);
     await loadData();
     setTrackingAll(false);
   };
@@ -472,8 +504,7 @@ function TrackPageFe() {
   const [trackingAll, setTrackingAll] = useState(false);
 
   const loadData = async () => {
-    const res = await fetch("https://backend-ktuk.onrender.com/fe_consignments");
-    const d = await res.json();
+    const d = await fetchAllPages("/fe_consignments");
 
     const cleaned = d.map(item => ({
       ...item,
@@ -502,7 +533,9 @@ function TrackPageFe() {
 
   const trackAll = async () => {
     setTrackingAll(true);
-    await fetch("https://backend-ktuk.onrender.com/track_franch");
+    const res = await fetch("https://backend-ktuk.onrender.com/track_franch");
+    const { job_id } = await res.json();
+    await waitForJob(job_id);
     await loadData();
     setTrackingAll(false);
   };
@@ -701,7 +734,7 @@ function UploadPageFe() {
       });
 
       const d = await res.json();
-      setMsg(`${d.message} (${d.count})`);
+      setMsg(`${d.message} (new: ${d.inserted}, updated: ${d.updated}, unchanged: ${d.unchanged})`);
     } catch (err) {
       setMsg("Upload failed.");
     }
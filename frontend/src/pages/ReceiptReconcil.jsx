@@ -32,6 +32,7 @@ export default function ReceiptReconcil() {
   const [tab, setTab] = useState("matched");
   const [loading, setLoading] = useState(false);
   const [errorMsg, setErrorMsg] = useState("");
+  const [bestMatch, setBestMatch] = useState(false);
 
   const submit = async () => {
     setErrorMsg("");
@@ -43,6 +44,8 @@ export default function ReceiptReconcil() {
     const formData = new FormData();
     formData.append("statement", statement);
     receipts.forEach((r) => formData.append("receipts", r));
+    // "optimal" pairs each amount by closest dates overall instead of first-fit
+    formData.append("mode", bestMatch ? "optimal" : "greedy");
 
     setLoading(true);
     try {
@@ -107,6 +110,16 @@ export default function ReceiptReconcil() {
             {loading ? "Processing..." : "Reconcile"}
           </button>
 
+          <label className="flex items-center gap-2 text-text-muted">
+            <input
+              type="checkbox"
+              checked={bestMatch}
+              onChange={(e) => setBestMatch(e.target.checked)}
+              disabled={loading}
+            />
+            Best date match
+          </label>
+
           {errorMsg && <p className="text-red-400 font-semibold">{errorMsg}</p>}
         </div>
       </div>
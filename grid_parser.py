@@ -0,0 +1,108 @@
+"""
+Parser for the tpcindia multiple-tracking results page.
+
+Only three things are read from the page: the GridView1 results table, the
+Label2 message shown instead of it (e.g. "No record found"), and the
+__VIEWSTATE / __VIEWSTATEGENERATOR pair reused by the next postback. The
+lxml path pulls those out with XPath over libxml2's tree and returns plain
+tuples; the BeautifulSoup walk it replaced is kept as a fallback for pages
+lxml cannot parse or where it misses the grid.
+
+Cell text follows BeautifulSoup's get_text(strip=True): every text node
+stripped, then concatenated, leaving out <script> and <style> contents.
+"""
+from typing import NamedTuple
+
+GRID_ID = "ContentPlaceHolderBottom_ContentPlaceHolderQuickLinkBottom_GridView1"
+LABEL_ID = "ContentPlaceHolderBottom_ContentPlaceHolderQuickLinkBottom_Label2"
+
+
+class ResultsPage(NamedTuple):
+    headers: tuple          # grid header texts; () when there is no grid
+    rows: list              # one tuple per data row, padded/truncated to the headers
+    found: bool             # whether the grid table was on the page
+    message: str | None     # Label2 text, if present
+    viewstate: dict | None  # state for the next postback, if present
+
+
+def _text(nodes):
+    return "".join(t.strip() for t in nodes)
+
+
+def _fit(cells, width):
+    if len(cells) < width:
+        cells = cells + [""] * (width - len(cells))
+    return tuple(cells[:width])
+
+
+def _viewstate(vs, vsg):
+    if vs is None or vsg is None:
+        return None
+    return {"__VIEWSTATE": vs, "__VIEWSTATEGENERATOR": vsg}
+
+
+def parse_results_lxml(html: str) -> ResultsPage:
+    from lxml import etree
+
+    doc = etree.fromstring(html, etree.HTMLParser())
+    if doc is None:
+        raise ValueError("Empty document")
+
+    def first(xpath, **params):
+        found = doc.xpath(xpath, **params)
+        return found[0] if found else None
+
+    # libxml2 indexes HTML id attributes, so id() is a hash lookup, not a tree scan
+    vs = first("id('__VIEWSTATE')/@value")
+    vsg = first("id('__VIEWSTATEGENERATOR')/@value")
+    # Compiled once per page; bs4's get_text() skips script/style text too
+    texts = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+
+    label = first("id($id)", id=LABEL_ID)
+    message = _text(texts(label)) if label is not None else None
+
+    table = first("id($id)[self::table]", id=GRID_ID)
+    if table is None:
+        return ResultsPage((), [], False, message, _viewstate(vs, vsg))
+
+    headers = tuple(_text(texts(th)) for th in table.xpath(".//tr[not(preceding-sibling::*)]//th"))
+    rows = []
+    for tr in list(table.iter("tr"))[1:]:
+        cells = [_text(texts(td)) for td in tr.iter("td", "th")]
+        if cells:
+            rows.append(_fit(cells, len(headers)))
+    return ResultsPage(headers, rows, True, message, _viewstate(vs, vsg))
+
+
+def parse_results_soup(html: str) -> ResultsPage:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "lxml")
+    vs = soup.select_one("#__VIEWSTATE")
+    vsg = soup.select_one("#__VIEWSTATEGENERATOR")
+    state = _viewstate(vs.get("value", "") if vs else None, vsg.get("value", "") if vsg else None)
+    label = soup.select_one(f"#{LABEL_ID}")
+    message = label.get_text(strip=True) if label else None
+
+    table = soup.select_one(f"#{GRID_ID}")
+    if table is None:
+        return ResultsPage((), [], False, message, state)
+
+    headers = tuple(th.get_text(strip=True) for th in table.select("tr:first-child th"))
+    rows = []
+    for tr in table.select("tr")[1:]:
+        cells = [td.get_text(strip=True) for td in tr.find_all(["td", "th"])]
+        if cells:
+            rows.append(_fit(cells, len(headers)))
+    return ResultsPage(headers, rows, True, message, state)
+
+
+def parse_results(html: str) -> ResultsPage:
+    """lxml/XPath first; BeautifulSoup if that fails or misses a grid that is there."""
+    try:
+        page = parse_results_lxml(html)
+    except Exception:
+        return parse_results_soup(html)
+    if not page.found and GRID_ID in html:
+        return parse_results_soup(html)
+    return page
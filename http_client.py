@@ -0,0 +1,125 @@
+"""
+Pooled HTTP client shared by the carrier trackers.
+
+Every session handed out here mounts the same process-wide HTTPAdapter, so
+keep-alive connections to tpcindia.com / franchexpress.com are reused across
+threads, batches and refreshes instead of paying TCP+TLS setup per call.
+The adapter applies default timeouts and retries connect errors and gateway
+5xx responses with exponential backoff plus jitter.
+
+Sessions themselves are per thread (cookies and the ASP.NET postback state
+are not safe to share); only the connection pool is common.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))           # connections kept per host
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))            # 0.5s, 1s, 2s, ...
+HTTP_BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", "0.5"))
+
+HTTP_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# 500 is left out on purpose: tpcindia answers a stale viewstate with a 500,
+# which the Professional Courier client handles itself by refetching the state
+RETRY_STATUSES = (502, 503, 504)
+
+
+# Process-wide counters: requests sent through the adapter vs sockets opened
+_counters = {"requests": 0, "connections": 0}
+_counters_lock = threading.Lock()
+
+
+def _count(key):
+    with _counters_lock:
+        _counters[key] += 1
+
+
+class CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        _count("connections")
+
+
+class CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _count("connections")
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CountingHTTPConnection
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that applies HTTP_TIMEOUT by default and counts connection reuse."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = HTTP_TIMEOUT
+        _count("requests")
+        return super().send(request, **kwargs)
+
+
+def build_retry():
+    return Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        read=HTTP_RETRIES,
+        status=HTTP_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        # Tracking postbacks are lookups, so retrying POST is safe
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=HTTP_BACKOFF,
+        backoff_jitter=HTTP_BACKOFF_JITTER,
+        raise_on_status=False,
+    )
+
+
+_adapter = PooledAdapter(
+    pool_connections=8,
+    pool_maxsize=HTTP_POOL_SIZE,
+    max_retries=build_retry(),
+)
+_local = threading.local()
+
+
+def session():
+    """This thread's Session, backed by the shared connection pool."""
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = _local.session = requests.Session()
+        s.mount("https://", _adapter)
+        s.mount("http://", _adapter)
+    return s
+
+
+def http_metrics():
+    """Requests sent vs connections opened on the shared pool, since process start."""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def reuse_ratio(requests_sent, connections_opened):
+    if not requests_sent:
+        return None
+    return round(1 - connections_opened / requests_sent, 3)
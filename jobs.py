@@ -0,0 +1,147 @@
+"""
+Background job queue backed by the `job` table.
+
+Endpoints call enqueue_job() and return the job id straight away; a worker
+process picks queued jobs up and records progress on the row:
+
+    python jobs.py
+
+Set JOB_WORKER_IN_PROCESS=1 to run the worker as a thread inside the web
+process instead (single-box deployments without a separate worker).
+
+Between jobs the worker also delivers queued mail (mailer.drain_outbox).
+
+A job still "running" JOB_TIMEOUT_SECONDS after it started belongs to a
+worker that was stopped mid-job (restart, deploy); the next claim marks it
+failed so it no longer shows as in progress.
+"""
+import os
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta
+
+from models import db, Job
+
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "3600"))
+
+
+def job_handlers():
+    from refresh import refresh_professional, refresh_franch
+    from report import send_daily_report
+    return {
+        "track_professional": refresh_professional,
+        "track_franch": refresh_franch,
+        "daily_report": send_daily_report,
+    }
+
+
+def enqueue_job(kind):
+    """
+    Queue a job of `kind`, or return the one already queued for it. A running
+    job doesn't count: it took its snapshot of due rows when it started, so
+    rows uploaded since would be left out.
+    """
+    queued = (Job.query
+              .filter_by(kind=kind, status="queued")
+              .order_by(Job.created_at)
+              .first())
+    if queued:
+        return queued
+
+    job = Job(id=uuid.uuid4().hex, kind=kind, status="queued", created_at=datetime.utcnow())
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def fail_stale_jobs(now):
+    """Mark jobs left running by a worker that died as failed; returns how many."""
+    stale = (Job.query
+             .filter(Job.status == "running",
+                     Job.started_at < now - timedelta(seconds=JOB_TIMEOUT_SECONDS))
+             .update({"status": "failed", "finished_at": now,
+                      "error": "Worker stopped before the job finished"},
+                     synchronize_session=False))
+    db.session.commit()
+    if stale:
+        print(f"Marked {stale} stale running job(s) as failed")
+    return stale
+
+
+def claim_next():
+    """Atomically move the oldest queued job to running; None if the queue is empty."""
+    fail_stale_jobs(datetime.utcnow())
+    while True:
+        job = Job.query.filter_by(status="queued").order_by(Job.created_at).first()
+        if job is None:
+            return None
+
+        # Conditional update so two workers never run the same job
+        claimed = (Job.query
+                   .filter_by(id=job.id, status="queued")
+                   .update({"status": "running", "started_at": datetime.utcnow()},
+                           synchronize_session=False))
+        db.session.commit()
+        if claimed:
+            db.session.refresh(job)
+            return job
+
+
+def run_job(job):
+    job_id = job.id
+    handler = job_handlers().get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        handler(job)
+        job.status = "done"
+    except Exception as e:
+        traceback.print_exc()
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.status = "failed"
+        job.error = str(e)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def run_worker(app, poll_interval=JOB_POLL_SECONDS, stop_event=None):
+    from mailer import drain_outbox
+
+    stop_event = stop_event or threading.Event()
+    with app.app_context():
+        while not stop_event.is_set():
+            try:
+                # Mail waits at most one job (or one poll interval) to go out
+                drain_outbox()
+                job = claim_next()
+                if job is None:
+                    db.session.remove()
+                    stop_event.wait(poll_interval)
+                    continue
+
+                print(f"Running job {job.id} ({job.kind})")
+                run_job(job)
+                db.session.remove()
+            except Exception:
+                # A transient DB or SMTP error must not end the loop: as a
+                # JOB_WORKER_IN_PROCESS thread nothing would restart it
+                traceback.print_exc()
+                print(f"Job worker iteration failed; retrying in {poll_interval}s")
+                db.session.rollback()
+                db.session.remove()
+                stop_event.wait(poll_interval)
+
+
+def start_worker_thread(app):
+    t = threading.Thread(target=run_worker, args=(app,), name="job-worker", daemon=True)
+    t.start()
+    return t
+
+
+if __name__ == "__main__":
+    from app import app
+    print("Job worker started")
+    run_worker(app)
@@ -0,0 +1,125 @@
+"""
+Keyset-paginated, filterable listing for the consignment tables.
+
+Rows are read as plain column tuples (no ORM objects) and only the requested
+fields are selected. Query parameters:
+
+    limit       page size (default DEFAULT_PAGE_SIZE, max MAX_PAGE_SIZE)
+    cursor      next_cursor from the previous page (rows with a larger id)
+    delivered   true / false
+    status      case-insensitive substring of last_status
+    from, to    tdate range, inclusive, YYYY-MM-DD
+    destn       destination, case-insensitive exact match
+    pincode     consignee pincode
+    fields      comma-separated subset of the response fields
+"""
+from datetime import timezone
+
+from sqlalchemy import func
+
+from models import db
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Response field -> model column
+FIELDS = {
+    "cno": "cno",
+    "status": "last_status",
+    "delivered": "is_delivered",
+    "last_checked": "last_checked",
+    "tdate": "tdate",
+    "cnee": "cnee",
+    "cpincode": "cpincode",
+    "destn": "destn",
+    "wt": "wt",
+    "pcs": "pcs",
+}
+
+
+def parse_bool(value):
+    value = value.strip().lower()
+    if value in ("true", "1", "yes"):
+        return True
+    if value in ("false", "0", "no"):
+        return False
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+def parse_int(args, name, default=None):
+    value = args.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+
+
+def parse_fields(args):
+    """Requested response fields in order; all of them when `fields` is absent."""
+    if not args.get("fields"):
+        return list(FIELDS)
+    fields = [f.strip() for f in args["fields"].split(",") if f.strip()]
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def apply_filters(query, model, args):
+    if args.get("delivered"):
+        query = query.filter(model.is_delivered == parse_bool(args["delivered"]))
+    if args.get("status"):
+        query = query.filter(model.last_status.ilike(f"%{args['status']}%"))
+    if args.get("from"):
+        query = query.filter(model.tdate >= args["from"])
+    if args.get("to"):
+        query = query.filter(model.tdate <= args["to"])
+    if args.get("destn"):
+        query = query.filter(func.lower(model.destn) == args["destn"].lower())
+    if args.get("pincode"):
+        query = query.filter(model.cpincode == args["pincode"])
+    return query
+
+
+def list_page(model, args):
+    """One page of `model` rows as dicts; raises ValueError on bad parameters."""
+    limit = parse_int(args, "limit", DEFAULT_PAGE_SIZE)
+    if limit < 1:
+        raise ValueError("'limit' must be positive")
+    limit = min(limit, MAX_PAGE_SIZE)
+    cursor = parse_int(args, "cursor")
+
+    fields = parse_fields(args)
+
+    columns = [model.id] + [getattr(model, FIELDS[f]) for f in fields]
+    query = apply_filters(db.session.query(*columns), model, args)
+    if cursor is not None:
+        query = query.filter(model.id > cursor)
+
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = []
+    for row in rows:
+        item = dict(zip(fields, row[1:]))
+        if item.get("last_checked") is not None:
+            # Stored as naive UTC; the offset lets the browser show local time
+            item["last_checked"] = item["last_checked"].replace(tzinfo=timezone.utc).isoformat()
+        items.append(item)
+
+    return {
+        "items": items,
+        "next_cursor": rows[-1][0] if has_more else None,
+    }
+
+
+def summary(model):
+    """Total / pending / delivered counts in a single aggregate query."""
+    total, delivered = db.session.query(
+        func.count(model.id),
+        func.count(model.id).filter(model.is_delivered.is_(True)),
+    ).one()
+    return {"total": total, "pending": total - delivered, "delivered": delivered}
@@ -0,0 +1,258 @@
+"""
+Outgoing mail, queued in the `outbox_email` table.
+
+enqueue_email() stores a message and returns straight away; the job worker
+calls drain_outbox() between jobs, which sends every due message over one
+connection (a single STARTTLS + login per drain rather than per message).
+A message that fails is retried with exponential backoff, MAIL_RETRY_SECONDS
+doubled per attempt, and left as "failed" after MAIL_MAX_ATTEMPTS.
+
+The transport is picked with MAIL_TRANSPORT:
+
+    smtp  SMTP_HOST:SMTP_PORT (default smtp.gmail.com:587); STARTTLS unless
+          SMTP_STARTTLS=0; logs in as SMTP_USER (default EMAIL_FROM) when
+          EMAIL_PASS is set. For a local stand-in, e.g.
+          `python -m aiosmtpd -n -l localhost:1025`, set SMTP_HOST=localhost
+          SMTP_PORT=1025 SMTP_STARTTLS=0 and leave EMAIL_PASS empty.
+    log   prints messages instead of sending them (development)
+
+Anything with open() / send(sender, recipients, message) / close() can be
+registered in TRANSPORTS or passed to drain_outbox() directly.
+"""
+import base64
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+from models import db, OutboxEmail
+
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "5"))
+MAIL_RETRY_SECONDS = float(os.getenv("MAIL_RETRY_SECONDS", "60"))
+
+# A batch still "sending" after this long belongs to a worker that died
+MAIL_CLAIM_TIMEOUT_SECONDS = float(os.getenv("MAIL_CLAIM_TIMEOUT_SECONDS", "900"))
+
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+
+
+class SmtpTransport:
+    def __init__(self):
+        self.host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.port = int(os.getenv("SMTP_PORT", "587"))
+        self.starttls = os.getenv("SMTP_STARTTLS", "1") == "1"
+        self.user = os.getenv("SMTP_USER") or os.getenv("EMAIL_FROM")
+        self.password = os.getenv("EMAIL_PASS")
+        self.server = None
+
+    def open(self):
+        import smtplib
+
+        server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+
+    def send(self, sender, recipients, message):
+        import smtplib
+
+        if self.server is None:
+            self.open()
+        try:
+            self.server.sendmail(sender, recipients, message.as_string())
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            raise  # the server rejected this message; the connection is still usable
+        except Exception:
+            self.close()  # reconnect for the next message
+            raise
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+        self.server = None
+
+
+class LogTransport:
+    def open(self):
+        pass
+
+    def send(self, sender, recipients, message):
+        print(f"MAIL from {sender} to {', '.join(recipients)}: {message['Subject']}")
+
+    def close(self):
+        pass
+
+
+TRANSPORTS = {
+    "smtp": SmtpTransport,
+    "log": LogTransport,
+}
+
+
+def get_transport():
+    name = os.getenv("MAIL_TRANSPORT", "smtp")
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown MAIL_TRANSPORT: {name}")
+    return TRANSPORTS[name]()
+
+
+def enqueue_email(subject, html_body, recipients=None, attachments=()):
+    """
+    Queue a message for the worker and return its outbox row.
+    `attachments` are (filename, bytes) or (filename, bytes, content_type).
+    """
+    recipients = recipients or os.getenv("EMAIL_TO")
+    if not recipients:
+        raise ValueError("No recipients (set EMAIL_TO)")
+
+    stored = []
+    for filename, data, *content_type in attachments:
+        stored.append({
+            "filename": filename,
+            "content_type": content_type[0] if content_type else "application/octet-stream",
+            "data": base64.b64encode(data).decode("ascii"),
+        })
+
+    row = OutboxEmail(
+        recipients=recipients if isinstance(recipients, str) else ", ".join(recipients),
+        subject=subject,
+        html_body=html_body,
+        attachments=stored,
+        status="queued",
+        attempts=0,
+        created_at=datetime.utcnow(),
+    )
+    db.session.add(row)
+    db.session.commit()
+    return row
+
+
+def recipient_list(row):
+    return [r.strip() for r in row.recipients.split(",") if r.strip()]
+
+
+def build_message(row, sender):
+    from email import encoders
+    from email.mime.base import MIMEBase
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg["From"] = sender
+    msg["To"] = ", ".join(recipient_list(row))
+    msg["Subject"] = row.subject
+
+    msg.attach(MIMEText(row.html_body or "", "html"))
+
+    for attachment in row.attachments or []:
+        part = MIMEBase(*attachment["content_type"].split("/", 1))
+        part.set_payload(base64.b64decode(attachment["data"]))
+        encoders.encode_base64(part)
+        part.add_header("Content-Disposition", "attachment", filename=attachment["filename"])
+        msg.attach(part)
+    return msg
+
+
+def claim_batch(now, limit):
+    """Mark up to `limit` due messages as sending for this caller and return them."""
+    due = or_(
+        (OutboxEmail.status == "queued")
+        & (OutboxEmail.next_attempt_at.is_(None) | (OutboxEmail.next_attempt_at <= now)),
+        (OutboxEmail.status == "sending")
+        & (OutboxEmail.claimed_at < now - timedelta(seconds=MAIL_CLAIM_TIMEOUT_SECONDS)),
+    )
+    ids = [i for (i,) in db.session.query(OutboxEmail.id).filter(due).order_by(OutboxEmail.id).limit(limit)]
+    if not ids:
+        return []
+
+    # Conditional update so two workers never send the same message
+    token = uuid.uuid4().hex
+    (OutboxEmail.query
+     .filter(OutboxEmail.id.in_(ids), due)
+     .update({"status": "sending", "claimed_by": token, "claimed_at": now},
+             synchronize_session=False))
+    db.session.commit()
+    return OutboxEmail.query.filter_by(claimed_by=token).order_by(OutboxEmail.id).all()
+
+
+def retry_at(now, attempts):
+    return now + timedelta(seconds=MAIL_RETRY_SECONDS * 2 ** (attempts - 1))
+
+
+def record_failure(row, error, stats):
+    row.last_error = str(error)
+    row.claimed_by = None
+    if row.attempts >= MAIL_MAX_ATTEMPTS:
+        row.status = "failed"
+        stats["failed"] += 1
+    else:
+        row.status = "queued"
+        row.next_attempt_at = retry_at(datetime.utcnow(), row.attempts)
+        stats["retrying"] += 1
+
+
+def drain_outbox(transport=None, batch_size=MAIL_BATCH_SIZE):
+    """
+    Send every due message, batch by batch, over one transport connection.
+    Returns counts of sent / retrying / failed messages.
+    """
+    stats = {"sent": 0, "retrying": 0, "failed": 0}
+    sender = os.getenv("EMAIL_FROM")
+    opened = False
+    try:
+        while True:
+            batch = claim_batch(datetime.utcnow(), batch_size)
+            if not batch:
+                break
+            for row in batch:
+                row.attempts = (row.attempts or 0) + 1
+
+            if not opened:
+                try:
+                    transport = transport or get_transport()
+                    transport.open()
+                    opened = True
+                except Exception as e:
+                    # Server unreachable or login refused: the rest can wait for the next drain
+                    for row in batch:
+                        record_failure(row, e, stats)
+                    db.session.commit()
+                    break
+
+            for row in batch:
+                try:
+                    transport.send(sender, recipient_list(row), build_message(row, sender))
+                except Exception as e:
+                    record_failure(row, e, stats)
+                else:
+                    row.status = "sent"
+                    row.sent_at = datetime.utcnow()
+                    row.last_error = None
+                    row.claimed_by = None
+                    stats["sent"] += 1
+                # Per message, so a crash mid-batch never re-sends what already went out
+                db.session.commit()
+    finally:
+        if opened:
+            transport.close()
+
+    if any(stats.values()):
+        print(f"Outbox: {stats['sent']} sent, {stats['retrying']} to retry, {stats['failed']} failed")
+    return stats
+
+
+def outbox_summary():
+    counts = dict(db.session.query(OutboxEmail.status, db.func.count()).group_by(OutboxEmail.status).all())
+    return {status: counts.get(status, 0) for status in ("queued", "sending", "sent", "failed")}
@@ -1,4 +1,14 @@
+from bisect import bisect_left, bisect_right
+from collections import deque
 from datetime import datetime
+from itertools import chain
+
+# A statement entry matches a receipt of the same amount dated at most this many days apart
+MATCH_WINDOW_DAYS = 2
+
+# greedy:  each entry in statement order takes the first fitting receipt (upload order)
+# optimal: per amount, the pairing with the most matches and least total date distance
+MATCH_MODES = ("greedy", "optimal")
 
 def parse_statement_date(date_str):
     # Handles: "20/01/2026 07:30:50"
@@ -10,32 +20,210 @@ def parse_receipt_date(date_str):
 def date_diff(d1, d2):
     return abs((d1 - d2).days)
 
-def match_entries(statement, receipts):
-    matched = []
-    missed = []
-    used_receipts = set()
+def day_parser(parse, key=None):
+    """
+    parse(date_str) as a date ordinal, memoised per distinct string: a month of
+    entries only has ~31 distinct dates, and strptime dominates otherwise.
+    `key` picks the part of the string that determines the date.
+    """
+    cache = {}
 
-    for stmt in statement:
-        stmt_date = parse_statement_date(stmt["date"])
-        found_match = None
+    def day(date_str):
+        k = key(date_str) if key else date_str
+        d = cache.get(k)
+        if d is None:
+            d = cache[k] = parse(k).toordinal()
+        return d
 
+    return day
+
+class ReceiptIndex:
+    """
+    Receipts bucketed by amount; each bucket maps a day (date ordinal) to the
+    indexes of its unused receipts in upload order, with the days kept sorted
+    so the match window is a bisect range. Dates are parsed once, here.
+    """
+
+    def __init__(self, receipts):
+        self.buckets = {}
+        receipt_day = day_parser(parse_receipt_date)
         for idx, rcp in enumerate(receipts):
-            if idx in used_receipts:
+            day = receipt_day(rcp["date"])
+            amount = rcp["amount"]
+            if amount != amount:  # NaN never equals a statement amount
                 continue
+            self.buckets.setdefault(amount, {}).setdefault(day, deque()).append(idx)
+        self.days = {amount: sorted(by_day) for amount, by_day in self.buckets.items()}
+
+    def window(self, amount, day):
+        """The day -> unused-index queues within MATCH_WINDOW_DAYS of `day`."""
+        by_day = self.buckets.get(amount)
+        if not by_day:
+            return []
+        days = self.days[amount]
+        lo = bisect_left(days, day - MATCH_WINDOW_DAYS)
+        hi = bisect_right(days, day + MATCH_WINDOW_DAYS)
+        return [by_day[d] for d in days[lo:hi] if by_day[d]]
+
+    def take_first(self, amount, day):
+        """
+        Claim the unused receipt the original nested loop would have picked:
+        the earliest uploaded one of the same amount inside the window.
+        """
+        queues = self.window(amount, day)
+        if not queues:
+            return None
+        first = min(queues, key=lambda q: q[0])
+        return first.popleft()
+
+def min_cost_flow(supply, demand, cost):
+    """
+    Transportation problem by successive shortest paths: supply[i] units at
+    source node i, demand[j] at sink node j, cost[(i, j)] for the allowed
+    pairs. Returns {(i, j): units} for a maximum flow of minimum total cost.
+    """
+    n_s, n_d = len(supply), len(demand)
+    source, sink = n_s + n_d, n_s + n_d + 1
+    graph = [[] for _ in range(n_s + n_d + 2)]
+    edges = []  # [to, capacity, cost, index of reverse edge]
+
+    def add_edge(u, v, capacity, c):
+        graph[u].append(len(edges))
+        edges.append([v, capacity, c, len(edges) + 1])
+        graph[v].append(len(edges))
+        edges.append([u, 0, -c, len(edges) - 1])
+
+    for i, units in enumerate(supply):
+        add_edge(source, i, units, 0)
+    for j, units in enumerate(demand):
+        add_edge(n_s + j, sink, units, 0)
+    pair_edges = {}
+    for (i, j), c in cost.items():
+        pair_edges[(i, j)] = len(edges)
+        add_edge(i, n_s + j, min(supply[i], demand[j]), c)
+
+    while True:
+        # Bellman-Ford: residual edges can have negative cost; the graph is tiny
+        dist = [None] * len(graph)
+        via = [None] * len(graph)
+        dist[source] = 0
+        for _ in range(len(graph)):
+            changed = False
+            for u, out in enumerate(graph):
+                if dist[u] is None:
+                    continue
+                for e in out:
+                    v, capacity, c, _ = edges[e]
+                    if capacity and (dist[v] is None or dist[u] + c < dist[v]):
+                        dist[v] = dist[u] + c
+                        via[v] = e
+                        changed = True
+            if not changed:
+                break
+        if dist[sink] is None:
+            break
+
+        push, v = None, sink
+        while v != source:
+            e = via[v]
+            push = edges[e][1] if push is None else min(push, edges[e][1])
+            v = edges[edges[e][3]][0]
+        v = sink
+        while v != source:
+            e = via[v]
+            edges[e][1] -= push
+            edges[edges[e][3]][1] += push
+            v = edges[edges[e][3]][0]
+
+    flows = {}
+    for pair, e in pair_edges.items():
+        units = edges[edges[e][3]][1]  # flow sent = capacity on the reverse edge
+        if units:
+            flows[pair] = units
+    return flows
+
+def solve_bucket(index, amount, stmts):
+    """
+    Optimal pairs for one amount: as many matches as possible, then the least
+    total date distance. Entries on the same day are interchangeable, so this
+    is solved between statement days and receipt days (a month has ~31 of
+    each) rather than entry by entry, then handed out in statement / upload order.
+    """
+    stmt_days = {}
+    for i, day in stmts:
+        stmt_days.setdefault(day, deque()).append(i)
+    by_day = index.buckets[amount]
+
+    s_days = sorted(stmt_days)
+    r_days = index.days[amount]
+    r_pos = {d: j for j, d in enumerate(r_days)}
+    cost = {}
+    for i, day in enumerate(s_days):
+        lo = bisect_left(r_days, day - MATCH_WINDOW_DAYS)
+        hi = bisect_right(r_days, day + MATCH_WINDOW_DAYS)
+        for d in r_days[lo:hi]:
+            cost[(i, r_pos[d])] = abs(day - d)
+
+    flows = min_cost_flow(
+        [len(stmt_days[d]) for d in s_days],
+        [len(by_day[d]) for d in r_days],
+        cost,
+    )
+
+    pairs = {}
+    for (i, j), units in sorted(flows.items()):
+        for _ in range(units):
+            pairs[stmt_days[s_days[i]].popleft()] = by_day[r_days[j]].popleft()
+    return pairs
+
+def optimal_assignment(statement, days, index):
+    by_amount = {}
+    for i, stmt in enumerate(statement):
+        if stmt["amount"] in index.buckets:
+            by_amount.setdefault(stmt["amount"], []).append((i, days[i]))
+
+    assigned = {}
+    for amount, stmts in by_amount.items():
+        assigned.update(solve_bucket(index, amount, stmts))
+    return assigned
+
+def match_entries(statement, receipts, mode="greedy"):
+    """
+    Pair statement entries with receipts of the same amount dated within
+    MATCH_WINDOW_DAYS; see MATCH_MODES. Greedy gives the same result as
+    comparing every entry against every receipt, in roughly linear time.
+    Returns (matched, missed) in statement order.
+
+    `statement` may be any iterable, e.g. pdf_utils.iter_statement_entries;
+    greedy mode matches each entry as it arrives, optimal mode reads it all first.
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {mode}")
+
+    matched = []
+    missed = []
+    entries = iter(statement)
+    first = next(entries, None)
+    if first is None:
+        return matched, missed
+    statement = chain([first], entries)
 
-            rcp_date = parse_receipt_date(rcp["date"])
+    index = ReceiptIndex(receipts)
+    statement_day = day_parser(parse_statement_date, key=lambda s: s.split()[0])
 
-            # ✅ MATCH ONLY ON AMOUNT + DATE
-            if stmt["amount"] == rcp["amount"]:
-                if date_diff(stmt_date, rcp_date) <= 2:
-                    found_match = rcp
-                    used_receipts.add(idx)
-                    break
+    if mode == "optimal":
+        statement = list(statement)
+        days = [statement_day(stmt["date"]) for stmt in statement]
+        assigned = optimal_assignment(statement, days, index)
+        pairs = ((stmt, assigned.get(i)) for i, stmt in enumerate(statement))
+    else:
+        pairs = ((stmt, index.take_first(stmt["amount"], statement_day(stmt["date"]))) for stmt in statement)
 
-        if found_match:
+    for stmt, idx in pairs:
+        if idx is not None:
             matched.append({
                 "statement": stmt,
-                "receipt": found_match
+                "receipt": receipts[idx]
             })
         else:
             missed.append(stmt)
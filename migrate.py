@@ -0,0 +1,111 @@
+"""
+Bring an existing database up to the current models.
+
+create_tables.py only creates missing tables; this adds the columns and
+indexes introduced since, backfilling data where needed. Every step checks
+the live schema first, so it is safe to re-run.
+
+    python migrate.py
+"""
+from sqlalchemy import inspect, text
+
+from app import app
+from models import db, Consignment, TrackingHistory, FranchExpress
+
+BACKFILL_BATCH = 5000
+
+
+def has_column(table, column):
+    return column in {c["name"] for c in inspect(db.engine).get_columns(table)}
+
+
+def has_index(table, name):
+    return name in {i["name"] for i in inspect(db.engine).get_indexes(table)}
+
+
+def add_tracking_history_event_hash():
+    if not has_column("tracking_history", "event_hash"):
+        db.session.execute(text("ALTER TABLE tracking_history ADD COLUMN event_hash VARCHAR(64)"))
+        db.session.commit()
+        print("Added tracking_history.event_hash")
+
+    # Backfill in batches so large history tables don't load into memory at once
+    filled = 0
+    while True:
+        rows = (db.session.query(
+                    TrackingHistory.id, TrackingHistory.delivery_date, TrackingHistory.destination,
+                    TrackingHistory.delivery_area, TrackingHistory.status, TrackingHistory.drs_no,
+                    TrackingHistory.stamp)
+                .filter(TrackingHistory.event_hash.is_(None))
+                .limit(BACKFILL_BATCH)
+                .all())
+        if not rows:
+            break
+        db.session.execute(
+            text("UPDATE tracking_history SET event_hash = :event_hash WHERE id = :id"),
+            [{"id": r.id, "event_hash": TrackingHistory.fingerprint(*r[1:])} for r in rows],
+        )
+        db.session.commit()
+        filled += len(rows)
+    if filled:
+        print(f"Backfilled event_hash for {filled} tracking_history rows")
+
+    if not has_index("tracking_history", "uq_tracking_history_event"):
+        # Older refreshes could store the same event twice; keep the first copy
+        deleted = db.session.execute(text(
+            "DELETE FROM tracking_history WHERE id NOT IN ("
+            " SELECT MIN(id) FROM tracking_history GROUP BY consignment_id, event_hash)"
+        )).rowcount
+        db.session.execute(text(
+            "CREATE UNIQUE INDEX uq_tracking_history_event "
+            "ON tracking_history (consignment_id, event_hash)"
+        ))
+        db.session.commit()
+        print(f"Created uq_tracking_history_event (removed {deleted} duplicate rows)")
+
+
+def add_next_check_at():
+    for table in ("consignment", "franch_express"):
+        if not has_column(table, "next_check_at"):
+            db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN next_check_at TIMESTAMP"))
+            db.session.commit()
+            print(f"Added {table}.next_check_at")
+
+
+def create_missing_indexes(model):
+    for index in model.__table__.indexes:
+        if not has_index(model.__tablename__, index.name):
+            index.create(db.engine)
+            print(f"Created {index.name}")
+
+
+def add_lookup_indexes():
+    for model in (Consignment, TrackingHistory, FranchExpress):
+        create_missing_indexes(model)
+
+
+def add_job_metrics():
+    if not has_column("job", "metrics"):
+        db.session.execute(text("ALTER TABLE job ADD COLUMN metrics JSON"))
+        db.session.commit()
+        print("Added job.metrics")
+
+
+MIGRATIONS = [
+    add_tracking_history_event_hash,
+    add_next_check_at,  # before add_lookup_indexes, which creates the *_due indexes
+    add_lookup_indexes,
+    add_job_metrics,
+]
+
+
+def migrate():
+    with app.app_context():
+        db.create_all()
+        for step in MIGRATIONS:
+            step()
+
+
+if __name__ == "__main__":
+    migrate()
+    print("Migrations applied")
@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import hashlib
 
 db = SQLAlchemy()
 
@@ -19,6 +20,18 @@ class Consignment(db.Model):
     last_status = db.Column(db.String(200))
     is_delivered = db.Column(db.Boolean, default=False)
     last_checked = db.Column(db.DateTime)
+    next_check_at = db.Column(db.DateTime)  # set by polling.py; NULL = due now
+
+    # Partial index covering only pending rows, so the refresh/report scans
+    # stay proportional to the backlog rather than all delivered history
+    __table_args__ = (
+        db.Index("ix_consignment_pending", "id",
+                 postgresql_where=db.text("is_delivered = false"),
+                 sqlite_where=db.text("is_delivered = 0")),
+        db.Index("ix_consignment_due", "next_check_at",
+                 postgresql_where=db.text("is_delivered = false"),
+                 sqlite_where=db.text("is_delivered = 0")),
+    )
 
 class TrackingHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -31,6 +44,21 @@ class TrackingHistory(db.Model):
     stamp = db.Column(db.String(200))
     scraped_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # sha256 of the event columns; (consignment_id, event_hash) is unique so
+    # history can be bulk-inserted with ON CONFLICT DO NOTHING
+    event_hash = db.Column(db.String(64))
+
+    __table_args__ = (
+        db.Index("uq_tracking_history_event", "consignment_id", "event_hash", unique=True),
+        db.Index("ix_tracking_history_consignment_scraped", "consignment_id", "scraped_at"),
+    )
+
+    @staticmethod
+    def fingerprint(delivery_date, destination, delivery_area, status, drs_no, stamp):
+        parts = [delivery_date, destination, delivery_area, status, drs_no, stamp]
+        raw = "\x1f".join("" if p is None else str(p) for p in parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 class FranchExpress(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     cno = db.Column(db.String(50), unique=True, nullable=False)
@@ -45,6 +73,76 @@ class FranchExpress(db.Model):
     last_status = db.Column(db.String(200))
     is_delivered = db.Column(db.Boolean, default=False)
     last_checked = db.Column(db.DateTime)
+    next_check_at = db.Column(db.DateTime)
 
     created_at = db.Column(db.DateTime, default=db.func.now())
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+
+    __table_args__ = (
+        db.Index("ix_franch_express_pending", "id",
+                 postgresql_where=db.text("is_delivered = false"),
+                 sqlite_where=db.text("is_delivered = 0")),
+        db.Index("ix_franch_express_due", "next_check_at",
+                 postgresql_where=db.text("is_delivered = false"),
+                 sqlite_where=db.text("is_delivered = 0")),
+    )
+
+class Job(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), default="queued", index=True)  # queued / running / done / failed
+
+    # Progress counters, updated as the job works through its batches
+    total = db.Column(db.Integer, default=0)
+    checked = db.Column(db.Integer, default=0)
+    updated = db.Column(db.Integer, default=0)
+    delivered = db.Column(db.Integer, default=0)
+    failed = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    metrics = db.Column(db.JSON)  # extra per-job counters, e.g. viewstate GETs saved
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        end = self.finished_at or (datetime.utcnow() if self.started_at else None)
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "checked": self.checked,
+            "updated": self.updated,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "error": self.error,
+            "metrics": self.metrics or {},
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": (end - self.started_at).total_seconds() if end else None,
+        }
+
+class OutboxEmail(db.Model):
+    """Outgoing mail, delivered by mailer.drain_outbox in the job worker."""
+    id = db.Column(db.Integer, primary_key=True)
+    recipients = db.Column(db.String(500), nullable=False)  # comma-separated
+    subject = db.Column(db.String(300))
+    html_body = db.Column(db.Text)
+    attachments = db.Column(db.JSON)  # [{"filename", "content_type", "data": base64}]
+
+    status = db.Column(db.String(20), default="queued")  # queued / sending / sent / failed
+    attempts = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime)  # NULL = send now; pushed back after a failure
+    claimed_by = db.Column(db.String(32))  # drain batch currently sending it
+    claimed_at = db.Column(db.DateTime)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index("ix_outbox_email_status_due", "status", "next_attempt_at"),
+        db.Index("ix_outbox_email_claimed_by", "claimed_by"),
+    )
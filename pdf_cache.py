@@ -0,0 +1,125 @@
+"""
+Disk cache of extracted /reconcile PDFs, keyed by the SHA-256 of the file.
+
+Accountants re-run reconciliation with the same statement and mostly the
+same receipts, so entries extracted once are stored as JSON under
+PDF_CACHE_DIR and reused whenever identical bytes are uploaded again.
+The cache is bounded by PDF_CACHE_MAX_MB: a hit touches the file's mtime,
+and after each store the least recently used files are deleted until the
+directory fits. PDF_CACHE_MAX_MB=0 turns caching off.
+
+Entries are stored per kind ("statement" / "receipt") and CACHE_VERSION;
+bump it whenever extraction output changes so stale results are not served.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join("instance", "pdf_cache"))
+PDF_CACHE_MAX_MB = float(os.getenv("PDF_CACHE_MAX_MB", "200"))
+
+CACHE_VERSION = 3
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, directory=PDF_CACHE_DIR, max_bytes=int(PDF_CACHE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def path(self, digest, kind):
+        return os.path.join(self.directory, f"{kind}-v{CACHE_VERSION}-{digest}.json")
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.counters[key] += n
+
+    def get(self, digest, kind):
+        """Cached entries for this file, or None."""
+        if not self.enabled:
+            return None
+        path = self.path(digest, kind)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+            os.utime(path)  # most recently used
+        except (OSError, ValueError):
+            self.count("misses")
+            return None
+        self.count("hits")
+        return entries
+
+    def put(self, digest, kind, entries):
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path(digest, kind))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.count("stores")
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used files until the cache fits in max_bytes."""
+        files = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.count("evictions")
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else None
+        stats["max_mb"] = self.max_bytes / (1024 * 1024)
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
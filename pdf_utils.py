@@ -1,59 +1,162 @@
-import pdfplumber
-import pandas as pd
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 
+import pdfplumber
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+# Processes used to extract /reconcile uploads; 1 extracts in the calling process
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+
+# Statement pages handed to a worker at a time; each task reopens the PDF once
+STATEMENT_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
 def clean_amount(val):
     return float(str(val).replace(",", "").strip())
 
+NON_ALNUM = re.compile(r"[^A-Z0-9 ]")
+SPACES = re.compile(r"\s+")
+
+# A receipt line: "05-Jan-26  Party Name  12,500.00"
+RECEIPT_LINE = re.compile(r"(\d{1,2}-[A-Za-z]{3}-\d{2})\s+(.*?)\s+([\d,]+\.\d{2})")
+# Either half on its own: a line with one of these but no RECEIPT_LINE match
+RECEIPT_FRAGMENT = re.compile(r"\d{1,2}-[A-Za-z]{3}-\d{2}|\d[\d,]*\.\d{2}\b")
+
 def normalize_text(text):
     text = text.upper()
-    text = re.sub(r"[^A-Z0-9 ]", " ", text)
-    text = re.sub(r"\s+", " ", text)
+    text = NON_ALNUM.sub(" ", text)
+    text = SPACES.sub(" ", text)
     return text.strip()
 
 def parse_date(date_str):
     return datetime.strptime(date_str, "%d-%b-%y").date()
 
 # -------- STATEMENT PDF --------
-def extract_statement_entries(pdf_path):
+def statement_table_entries(table):
     entries = []
-
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            table = page.extract_table()
-            if not table:
+    for row in table:
+        try:
+            # Skip header rows safely
+            if row[1] and "DATE" in row[1].upper():
                 continue
 
-            for row in table:
-                try:
-                    # Skip header rows safely
-                    if row[1] and "DATE" in row[1].upper():
-                        continue
-
-                    date = row[1]
-                    desc = row[3]
-                    deposit = row[6]
-
-                    if date and deposit:
-                        entries.append({
-                            "date": date,
-                            "description": normalize_text(desc),
-                            "amount": clean_amount(deposit)
-                        })
-                except Exception:
-                    continue
+            date = row[1]
+            desc = row[3]
+            deposit = row[6]
 
+            if date and deposit:
+                entries.append({
+                    "date": date,
+                    "description": normalize_text(desc),
+                    "amount": clean_amount(deposit)
+                })
+        except Exception:
+            continue
     return entries
 
+def iter_statement_entries(pdf_path, start=0, stop=None):
+    """
+    Yield entries from pages [start, stop) of a statement, one page at a time.
+    Each page is closed once its table is read, dropping pdfplumber's cached
+    layout objects, so memory stays flat however long the statement is.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:stop]:
+            try:
+                table = page.extract_table()
+            finally:
+                page.close()
+            if table:
+                yield from statement_table_entries(table)
+
+def extract_statement_pages(pdf_path, start, stop):
+    """Entries from pages [start, stop) of a statement, in page order."""
+    return list(iter_statement_entries(pdf_path, start, stop))
+
+def count_pages(pdf_path):
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+def extract_statement_entries(pdf_path):
+    return extract_statement_pages(pdf_path, 0, None)
+
 # -------- RECEIPT PDF --------
-def extract_receipt_entries(pdf_path):
+class TextLineDevice(PDFTextDevice):
+    """
+    Collects the text layer as lines, in content-stream order, without
+    pdfminer's layout analysis: no LTChar objects, no grouping into boxes.
+    A line ends when the baseline moves; a horizontal gap becomes a space.
+    """
+
+    def __init__(self, rsrcmgr):
+        super().__init__(rsrcmgr)
+        self.lines = []
+        self.chars = []
+        self.x = self.y = None
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+        try:
+            text = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            text = ""
+        adv = font.char_width(cid) * fontsize * scaling
+
+        x, y = matrix[4], matrix[5]
+        size = fontsize * (abs(matrix[3]) or 1)
+        if self.y is None or abs(y - self.y) > size / 2:
+            self.end_line()
+        elif x - self.x > size * 0.15:
+            self.chars.append(" ")
+        self.chars.append(text)
+        self.x, self.y = x + adv * matrix[0], y
+        return adv
+
+    def end_line(self):
+        if self.chars:
+            self.lines.append("".join(self.chars))
+            self.chars = []
+        self.x = self.y = None
+
+def receipt_text_pages(pdf_path):
+    """Text lines of each page, straight from the text layer."""
+    rsrcmgr = PDFResourceManager()
+    device = TextLineDevice(rsrcmgr)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+    pages = []
+    with open(pdf_path, "rb") as f:
+        for page in PDFPage.get_pages(f):
+            interpreter.process_page(page)
+            device.end_line()
+            pages.append(device.lines)
+            device.lines = []
+    return pages
+
+def scan_receipt_lines(lines):
+    """
+    (entries, suspect) for one page's lines. suspect means a line holds a
+    receipt date or amount without forming a whole entry, e.g. because the
+    content stream draws a row's amount before its date.
+    """
     entries = []
-    with pdfplumber.open(pdf_path) as pdf:
-        text = pdf.pages[0].extract_text().split("\n")
+    suspect = False
+    for line in lines:
+        if RECEIPT_LINE.search(line):
+            entries.extend(receipt_line_entries([line]))
+        elif RECEIPT_FRAGMENT.search(line):
+            suspect = True
+    return entries, suspect
 
-    for line in text:
-        match = re.search(r"(\d{1,2}-[A-Za-z]{3}-\d{2})\s+(.*?)\s+([\d,]+\.\d{2})", line)
+def receipt_line_entries(lines):
+    entries = []
+    for line in lines:
+        match = RECEIPT_LINE.search(line)
         if match:
             entries.append({
                 "date": match.group(1),
@@ -61,3 +164,145 @@ def extract_receipt_entries(pdf_path):
                 "amount": clean_amount(match.group(3))
             })
     return entries
+
+def layout_page_lines(pdf_path, page_numbers=None):
+    """{page number: text lines} via pdfplumber's layout-aware extract_text(); all pages by default."""
+    lines = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        numbers = range(len(pdf.pages)) if page_numbers is None else page_numbers
+        for n in numbers:
+            page = pdf.pages[n]
+            try:
+                lines[n] = (page.extract_text() or "").split("\n")
+            finally:
+                page.close()
+    return lines
+
+def layout_text_lines(pdf_path):
+    return [line for lines in layout_page_lines(pdf_path).values() for line in lines]
+
+def extract_receipt_entries(pdf_path):
+    # Fast path first. A page it can't read cleanly (see scan_receipt_lines) is
+    # re-read layout-aware, as is the whole file when the fast path finds nothing
+    # at all, e.g. fonts without a unicode map
+    try:
+        scanned = [scan_receipt_lines(lines) for lines in receipt_text_pages(pdf_path)]
+    except Exception:
+        scanned = []
+    if not any(entries for entries, _ in scanned):
+        return receipt_line_entries(layout_text_lines(pdf_path))
+
+    redo = [n for n, (_, suspect) in enumerate(scanned) if suspect]
+    layout = layout_page_lines(pdf_path, redo) if redo else {}
+    result = []
+    for n, (entries, _) in enumerate(scanned):
+        result.extend(receipt_line_entries(layout[n]) if n in layout else entries)
+    return result
+
+# -------- PARALLEL EXTRACTION --------
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    # One pool for the process, started on first use; forkserver/spawn rather
+    # than fork because the web process is multi-threaded
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=ctx)
+        return _pool
+
+def shutdown_pool(pool=None):
+    """Shut the shared pool down; with `pool`, only if that is still the shared one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and pool in (None, _pool):
+            _pool.shutdown()
+            _pool = None
+
+def extract_uncached(pool, kinds, paths):
+    """Extract each (kind, path); on the pool when given, in page/submission order either way."""
+    if pool is None:
+        return [
+            extract_statement_entries(path) if kind == "statement" else extract_receipt_entries(path)
+            for kind, path in zip(kinds, paths)
+        ]
+
+    try:
+        return extract_on_pool(pool, kinds, paths)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory) and took the pool with it;
+        # start a fresh one so this and later runs don't all fail
+        print("PDF worker pool broken; restarting it and retrying")
+        shutdown_pool(pool)
+        return extract_on_pool(get_pool(), kinds, paths)
+
+def extract_on_pool(pool, kinds, paths):
+    tasks = []
+    for kind, path in zip(kinds, paths):
+        if kind == "statement":
+            tasks.append([
+                pool.submit(extract_statement_pages, path, start, start + STATEMENT_PAGES_PER_TASK)
+                for start in range(0, count_pages(path), STATEMENT_PAGES_PER_TASK)
+            ])
+        else:
+            tasks.append([pool.submit(extract_receipt_entries, path)])
+
+    results = []
+    for parts in tasks:
+        entries = []
+        for task in parts:
+            entries.extend(task.result())
+        results.append(entries)
+    return results
+
+def extract_reconcile_inputs(statement_path, receipt_paths, cache_stats=None):
+    """
+    Statement entries and receipt entries for one /reconcile run.
+
+    Files whose bytes were extracted before come from the pdf_cache; the
+    rest are extracted once per distinct file. With PDF_WORKERS > 1, the
+    statement is split into page ranges and every receipt is its own task,
+    all on the shared process pool. Results are collected in submission
+    order, so entries come back in the same order as extracting serially:
+    statement pages first to last, receipts in upload order. Both are lists;
+    memory stays bounded because extraction closes each page once it is read.
+
+    If cache_stats is a dict, this run's cache hits/misses are added to it.
+    """
+    from pdf_cache import file_sha256, get_cache
+
+    cache = get_cache()
+    kinds = ["statement"] + ["receipt"] * len(receipt_paths)
+    paths = [statement_path] + list(receipt_paths)
+    digests = [file_sha256(path) for path in paths]
+
+    found = {}
+    for kind, digest in dict.fromkeys(zip(kinds, digests)):
+        entries = cache.get(digest, kind)
+        if entries is not None:
+            found[(kind, digest)] = entries
+
+    # One extraction per distinct file not in the cache
+    missing = {}
+    for kind, path, digest in zip(kinds, paths, digests):
+        if (kind, digest) not in found:
+            missing.setdefault((kind, digest), path)
+    if cache_stats is not None:
+        cache_stats["hits"] = cache_stats.get("hits", 0) + len(found)
+        cache_stats["misses"] = cache_stats.get("misses", 0) + len(missing)
+
+    if missing:
+        pool = get_pool() if PDF_WORKERS > 1 else None
+        keys = list(missing)
+        extracted = extract_uncached(pool, [k[0] for k in keys], list(missing.values()))
+        for (kind, digest), entries in zip(keys, extracted):
+            cache.put(digest, kind, entries)
+            found[(kind, digest)] = entries
+
+    # Fresh lists per file, so duplicate uploads don't share entry dicts
+    statement = [dict(e) for e in found[(kinds[0], digests[0])]]
+    receipts = [dict(e) for key in zip(kinds[1:], digests[1:]) for e in found[key]]
+    return statement, receipts
@@ -0,0 +1,94 @@
+"""
+Adaptive polling schedule for pending consignments.
+
+After each tracking attempt a consignment gets a next_check_at, and refreshes
+only pick up rows that are due (or have never been scheduled). The interval
+depends on how likely the status is to move soon:
+
+- Out for delivery                     -> POLL_OUT_FOR_DELIVERY
+- new tracking event within a day      -> POLL_ACTIVE
+- no new event for STALE_AFTER_DAYS, or
+  booked more than STALE_AGE_DAYS ago  -> POLL_STALE
+- anything else in transit             -> POLL_IN_TRANSIT
+- tracking call failed                 -> POLL_RETRY
+
+Timestamps (last_checked, next_check_at, scraped_at) are naive UTC, written
+with datetime.utcnow() like the job and outbox tables. Don't store aware
+values: Postgres converts them to the session zone, SQLite drops the offset.
+Convert with as_ist() for display or for comparisons with IST dates.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from sqlalchemy import or_
+
+IST = pytz.timezone("Asia/Kolkata")
+
+
+def _hours(name, default):
+    return timedelta(hours=float(os.getenv(name, default)))
+
+
+POLL_OUT_FOR_DELIVERY = _hours("POLL_OUT_FOR_DELIVERY_HOURS", "1")
+POLL_ACTIVE = _hours("POLL_ACTIVE_HOURS", "3")
+POLL_IN_TRANSIT = _hours("POLL_IN_TRANSIT_HOURS", "6")
+POLL_STALE = _hours("POLL_STALE_HOURS", "24")
+POLL_RETRY = _hours("POLL_RETRY_HOURS", "0.5")
+
+STALE_AFTER_DAYS = int(os.getenv("POLL_STALE_AFTER_DAYS", "5"))
+STALE_AGE_DAYS = int(os.getenv("POLL_STALE_AGE_DAYS", "14"))
+
+TDATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y")
+
+
+def as_ist(dt):
+    """A DB timestamp (naive UTC) as an aware IST datetime."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(IST)
+
+
+def parse_tdate(tdate):
+    if not tdate:
+        return None
+    for fmt in TDATE_FORMATS:
+        try:
+            return datetime.strptime(tdate.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def poll_interval(status, now, last_event_at=None, tdate=None, failed=False):
+    if failed:
+        return POLL_RETRY
+
+    if "out for delivery" in (status or "").lower():
+        return POLL_OUT_FOR_DELIVERY
+
+    now = as_ist(now)
+    booked = parse_tdate(tdate)  # an IST calendar date
+    if booked and (now.date() - booked).days > STALE_AGE_DAYS:
+        return POLL_STALE
+
+    last_event_at = as_ist(last_event_at)
+    if last_event_at is not None:
+        quiet = now - last_event_at
+        if quiet >= timedelta(days=STALE_AFTER_DAYS):
+            return POLL_STALE
+        if quiet < timedelta(days=1):
+            return POLL_ACTIVE
+
+    return POLL_IN_TRANSIT
+
+
+def next_check_at(status, now, last_event_at=None, tdate=None, failed=False):
+    return now + poll_interval(status, now, last_event_at, tdate, failed)
+
+
+def due(query, model, now):
+    """Restrict a pending-consignment query to rows whose next check has come."""
+    return query.filter(or_(model.next_check_at.is_(None), model.next_check_at <= now))
@@ -1,43 +1,88 @@
 import pandas as pd
 from models import db, FranchExpress
+from sqlalchemy import insert, update
+from excel_stream import read_sheet_chunks
+from processor import fetch_existing
 
 EXPECTED_FE_COLS = ["Consignment No", "Date", "Name", "Pincode", "Destination", "WEIGHT", "Pcs","BOX"]
 
-def process_excel_fe(path):
-    df = pd.read_excel(path, dtype=str)
+FIELDS = ["tdate", "cnee", "cpincode", "destn", "wt", "pcs"]
+
+
+def blank_to_none(series):
+    s = series.astype(object)
+    s = s.where(s.notna(), None)
+    return s.map(lambda v: None if v is None or not str(v).strip() else v)
 
+
+def normalize_frame_fe(df):
+    """Column-wise cleaning of an FE sheet into FranchExpress field values."""
     for col in EXPECTED_FE_COLS:
         if col not in df.columns:
             df[col] = ""
 
-    count = 0
+    cno = df["Consignment No"].fillna("").astype(str).str.strip().str.upper()
+    valid = (cno != "") & cno.str.isdigit()
+
+    # BOX wins over Pcs; both blank -> ""
+    box = df["BOX"].fillna("").astype(str).str.strip()
+    pcs = df["Pcs"].fillna("").astype(str).str.strip()
+
+    out = pd.DataFrame({
+        "cno": cno,
+        "tdate": blank_to_none(df["Date"].str.split(" ").str[0]),  # only date
+        "cnee": blank_to_none(df["Name"]),
+        "cpincode": blank_to_none(df["Pincode"]),
+        "destn": blank_to_none(df["Destination"]),
+        "wt": blank_to_none(df["WEIGHT"]),
+        "pcs": box.where(box != "", pcs),
+    })
+    return out[valid].astype(object)
 
-    for _, row in df.iterrows():
-        cno = str(row["Consignment No"]).strip().upper()
-        if not cno or not cno.isdigit():
-            continue
 
-        existing = FranchExpress.query.filter_by(cno=cno).first()
+def values_of(row):
+    return tuple(row[f] or "" for f in FIELDS)
 
-        if not existing:
-            existing = FranchExpress(cno=cno)
-            db.session.add(existing)
-            count += 1  # Only count new entries
 
-        existing.tdate = str(row["Date"]).split(" ")[0]  # only date
-        existing.cnee = row["Name"]
-        existing.cpincode = row["Pincode"]
-        existing.destn = row["Destination"]
-        existing.wt = row["WEIGHT"]
-        box_val = str(row.get("BOX", "")).strip()
-        pcs_val = str(row.get("Pcs", "")).strip()
+def upsert_chunk_fe(df, counts):
+    """
+    Diff one FE sheet chunk against the DB, write it (no commit) and add its
+    inserted / updated / unchanged numbers to counts. Nothing is kept between
+    chunks, so memory stays flat however long the upload is; a number that
+    repeats in a later chunk is counted again there, against what the earlier
+    chunk wrote.
+    """
+    rows = normalize_frame_fe(df).to_dict("records")
 
-        if box_val:
-            existing.pcs = box_val
-        elif pcs_val:
-            existing.pcs = pcs_val
+    # Last occurrence of a repeated number wins, as with the row-by-row overwrite
+    latest = {row["cno"]: row for row in rows}
+    existing = fetch_existing(FranchExpress, list(latest), FIELDS)
+
+    inserts = []
+    updates = []
+
+    for cno, row in latest.items():
+        current = existing.get(cno)
+        if current is None:
+            inserts.append(row)
+            counts["inserted"] += 1
+        elif values_of(current) != values_of(row):
+            # Only rows that really differ are written, so updated_at stays meaningful
+            updates.append({"id": current["id"], **{f: row[f] for f in FIELDS}})
+            counts["updated"] += 1
         else:
-            existing.pcs = ""
+            counts["unchanged"] += 1
+
+    if inserts:
+        db.session.execute(insert(FranchExpress), inserts)
+    if updates:
+        db.session.execute(update(FranchExpress), updates)
 
+
+def process_excel_fe(path):
+    """Upsert an FE sheet. Returns {"inserted", "updated", "unchanged"} counts."""
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for df in read_sheet_chunks(path):
+        upsert_chunk_fe(df, counts)
     db.session.commit()
-    return count
+    return counts
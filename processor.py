@@ -1,70 +1,102 @@
 import pandas as pd
 from models import db, Consignment
 import re
-from datetime import datetime
+from sqlalchemy import insert, update
+from excel_stream import read_sheet_chunks
 
 EXPECTED_COLS = ["CNo", "Tdate", "cnee", "CPincode", "Destn", "Wt", "Pcs"]
 
+# Sheet column -> Consignment field
+FIELD_MAP = {"cnee": "cnee", "CPincode": "cpincode", "Destn": "destn", "Wt": "wt", "Pcs": "pcs"}
+FIELDS = ["tdate", "cnee", "cpincode", "destn", "wt", "pcs"]
+
+# Keep IN (...) lists under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 900
+
 
 VALID_CNO_REGEX = re.compile(r"^MAA\d+$", re.IGNORECASE)
-def process_excel(path):
-    df = pd.read_excel(path, dtype=str)
 
+
+def normalize_frame(df):
+    """Column-wise cleaning: valid CNos only, Tdate as ISO date, blanks as None."""
     # ✅ Ensure missing columns exist
     for col in EXPECTED_COLS:
         if col not in df.columns:
             df[col] = ""
 
+    cno = df["CNo"].fillna("").astype(str).str.strip().str.upper()
+    valid = cno.str.match(VALID_CNO_REGEX)
+
+    # ✅ Convert Tdate safely (each value parsed on its own, bad dates -> None)
+    tdate = pd.to_datetime(df["Tdate"], errors="coerce", format="mixed")
+
+    out = pd.DataFrame({"cno": cno, "tdate": tdate.dt.strftime("%Y-%m-%d")})
+    for col, field in FIELD_MAP.items():
+        out[field] = df[col]
+
+    out = out[valid].astype(object)
+    return out.where(out.notna(), None)
+
+
+def fetch_existing(model, cnos, fields=FIELDS):
+    """{cno: {"id": ..., field: value}} for every stored row of model in cnos."""
+    columns = [model.id, model.cno] + [getattr(model, f) for f in fields]
+    existing = {}
+    for i in range(0, len(cnos), LOOKUP_CHUNK):
+        for row in db.session.query(*columns).filter(model.cno.in_(cnos[i:i + LOOKUP_CHUNK])):
+            existing[row.cno] = row._asdict()
+    return existing
+
+
+def upsert_chunk(df):
+    """Diff one sheet chunk against the DB and write it (no commit). Returns changed count."""
+    rows = normalize_frame(df).to_dict("records")
+
+    existing = fetch_existing(Consignment, list({r["cno"] for r in rows}))
+
+    inserts = {}   # cno -> values for new consignments
+    updates = {}   # id -> changed values for stored consignments
     count = 0
 
-    for _, row in df.iterrows():
-        cno = str(row["CNo"]).strip().upper()
-        if not cno or not VALID_CNO_REGEX.match(cno):
+    # Rows are diffed in sheet order, so a CNo repeated in the sheet is compared
+    # against its earlier occurrence exactly as the row-by-row version did
+    for row in rows:
+        cno = row["cno"]
+        current = existing.get(cno) or inserts.get(cno)
+
+        if current is None:
+            # ✅ Insert new record
+            inserts[cno] = dict(row)
+            count += 1
             continue
 
-        existing = Consignment.query.filter_by(cno=cno).first()
+        # ✅ Update only if value changed
+        changed = {f: row[f] for f in FIELDS if str(current[f]) != str(row[f])}
+        if not changed:
+            continue
 
-        updated = False  # ✅ Flag to track changes
+        current.update(changed)
+        if "id" in current:
+            updates[current["id"]] = {"id": current["id"], **{f: current[f] for f in FIELDS}}
+        count += 1
 
-        # ✅ Insert new record
-        if not existing:
-            existing = Consignment(cno=cno)
-            db.session.add(existing)
-            updated = True
+    if inserts:
+        db.session.execute(insert(Consignment), list(inserts.values()))
+    if updates:
+        db.session.execute(update(Consignment), list(updates.values()))
 
-        # ✅ Convert Tdate safely
-        raw_date = row["Tdate"]
-        try:
-            new_tdate = pd.to_datetime(raw_date).date()
-        except:
-            new_tdate = None
+    return count
 
-        # ✅ Update only if value changed
-        def update_if_changed(obj, field, new_value):
-            nonlocal updated
-            old_value = getattr(obj, field)
-
-            # Convert dates to string for comparison
-            if hasattr(old_value, 'isoformat'):
-                old_value = old_value.isoformat()
-
-            if hasattr(new_value, 'isoformat'):
-                new_value = new_value.isoformat()
-
-            if str(old_value) != str(new_value):
-                setattr(obj, field, new_value)
-                updated = True
-
-        update_if_changed(existing, "tdate", new_tdate)
-        update_if_changed(existing, "cnee", row["cnee"])
-        update_if_changed(existing, "cpincode", row["CPincode"])
-        update_if_changed(existing, "destn", row["Destn"])
-        update_if_changed(existing, "wt", row["Wt"])
-        update_if_changed(existing, "pcs", row["Pcs"])
-
-       
-        if updated:
-            db.session.commit()
-            count += 1
+
+def process_excel(path):
+    count = 0
+
+    # Large manifests arrive in fixed-size chunks; later chunks see earlier
+    # chunks' writes, so repeated CNos behave the same as in one pass
+    for df in read_sheet_chunks(path):
+        count += upsert_chunk(df)
+
+    # ✅ One transaction for the whole sheet
+    db.session.commit()
 
     return count
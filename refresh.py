@@ -0,0 +1,241 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import func, update
+
+from models import db, Consignment, TrackingHistory, FranchExpress
+from polling import due, next_check_at
+from test_excel import chunked
+
+# Consignments tracked and committed per step; also how often job progress is saved
+REFRESH_CHUNK = int(os.getenv("REFRESH_CHUNK", "500"))
+
+
+PROGRESS_FIELDS = ("checked", "updated", "delivered", "failed")
+
+
+def new_stats():
+    return {field: 0 for field in PROGRESS_FIELDS}
+
+
+def save_progress(job, stats):
+    if job is None:
+        return
+    job.checked = stats["checked"]
+    job.updated = stats["updated"]
+    job.delivered = stats["delivered"]
+    job.failed = stats["failed"]
+    job.metrics = {k: v for k, v in stats.items() if k not in PROGRESS_FIELDS}
+
+
+def add_http_metrics(stats, before):
+    """Connection reuse on the shared HTTP pool since `before` (an http_metrics() snapshot)."""
+    from http_client import http_metrics, reuse_ratio
+
+    now = http_metrics()
+    stats["http_requests"] = now["requests"] - before["requests"]
+    stats["http_connections"] = now["connections"] - before["connections"]
+    stats["http_reuse_ratio"] = reuse_ratio(stats["http_requests"], stats["http_connections"])
+
+
+def insert_history(rows):
+    """
+    Set-based insert of scraped TrackingHistory rows; events already stored for
+    the consignment (same event_hash) are skipped by the unique index.
+    """
+    if not rows:
+        return
+
+    for row in rows:
+        row["event_hash"] = TrackingHistory.fingerprint(
+            row["delivery_date"], row["destination"], row["delivery_area"],
+            row["status"], row["drs_no"], row["stamp"],
+        )
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # No ON CONFLICT: filter against what is stored with one query instead
+        from sqlalchemy import insert
+        existing = set(
+            db.session.query(TrackingHistory.consignment_id, TrackingHistory.event_hash)
+            .filter(TrackingHistory.consignment_id.in_({r["consignment_id"] for r in rows}))
+        )
+        rows = [r for r in rows if (r["consignment_id"], r["event_hash"]) not in existing]
+        rows = list({(r["consignment_id"], r["event_hash"]): r for r in rows}.values())
+        if rows:
+            db.session.execute(insert(TrackingHistory.__table__), rows)
+        return
+
+    stmt = insert(TrackingHistory.__table__).on_conflict_do_nothing(
+        index_elements=["consignment_id", "event_hash"]
+    )
+    db.session.execute(stmt, rows)
+
+
+def last_event_times(consignment_ids):
+    """When each consignment's newest tracking event was first scraped."""
+    return dict(
+        db.session.query(TrackingHistory.consignment_id, func.max(TrackingHistory.scraped_at))
+        .filter(TrackingHistory.consignment_id.in_(consignment_ids))
+        .group_by(TrackingHistory.consignment_id)
+    )
+
+
+def due_pending(model, stats, now, *columns):
+    """
+    Pending rows whose next check has come, as plain column tuples (no ORM
+    objects to dirty-track); the rest are counted as skipped.
+    """
+    pending = db.session.query(model.id, model.cno, model.last_status, model.tdate, *columns) \
+        .filter_by(is_delivered=False)
+    rows = due(pending, model, now).all()
+    stats["skipped_not_due"] = pending.count() - len(rows)
+    return rows
+
+
+def status_update(row, status, now, next_at):
+    """
+    Parameters for the UPDATE of one tracked row: the status columns only
+    when the status actually changed, otherwise just the check timestamps.
+    """
+    params = {"id": row.id, "last_checked": now, "next_check_at": next_at}
+    delivered = status.lower() == "delivered"
+    if status != row.last_status or delivered:
+        params["last_status"] = status
+        params["is_delivered"] = delivered
+    return params
+
+
+def bulk_update(model, rows):
+    """
+    Batched ORM UPDATE by primary key. Rows are grouped by the columns they
+    set, so each group is a single executemany.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    for batch in groups.values():
+        db.session.execute(update(model), batch)
+
+
+def count_changes(stats, updates):
+    for params in updates:
+        if "last_status" in params:
+            stats["updated"] += 1
+            if params["is_delivered"]:
+                stats["delivered"] += 1
+        elif "last_checked" in params:
+            stats["unchanged"] += 1
+
+
+def refresh_professional(job=None):
+    """Re-track pending Professional Courier consignments that are due. Returns progress counts."""
+    from tracker import get_tracking_info_bulk
+    from test_excel import VIEWSTATE_COUNTERS
+    from http_client import http_metrics
+
+    stats = new_stats()
+    stats["unchanged"] = 0
+    viewstate_before = dict(VIEWSTATE_COUNTERS)
+    http_before = http_metrics()
+    pending = due_pending(Consignment, stats, datetime.utcnow())
+    if job is not None:
+        job.total = len(pending)
+        db.session.commit()
+
+    for chunk in chunked(pending, REFRESH_CHUNK):
+        tracked = get_tracking_info_bulk([row.cno for row in chunk])
+        now = datetime.utcnow()  # naive UTC, see polling.py
+        history = []
+        polled = []
+        updates = []
+
+        for row in chunk:
+            stats["checked"] += 1
+            data = tracked.get(row.cno.strip().upper())
+
+            if not data:
+                stats["failed"] += 1
+                updates.append({"id": row.id, "next_check_at": next_check_at(row.last_status, now, failed=True)})
+                continue
+
+            polled.append((row, data[-1].status.strip()))
+            # dict.fromkeys drops events the portal repeated within this scrape
+            for event in dict.fromkeys(data):
+                history.append({
+                    "consignment_id": row.id,
+                    "delivery_date": event.delivery_date,
+                    "destination": event.destination,
+                    "delivery_area": event.delivery_area,
+                    "status": event.status,
+                    "drs_no": event.drs_no,
+                    "stamp": event.stamp,
+                    "scraped_at": now,
+                })
+
+        insert_history(history)
+
+        # Scheduled after the insert so events first seen in this pass count as recent
+        last_events = last_event_times([row.id for row, _ in polled])
+        for row, status in polled:
+            next_at = next_check_at(status, now, last_events.get(row.id), row.tdate)
+            updates.append(status_update(row, status, now, next_at))
+
+        count_changes(stats, updates)
+        bulk_update(Consignment, updates)
+        stats["viewstate_gets"] = VIEWSTATE_COUNTERS["fetched"] - viewstate_before["fetched"]
+        stats["viewstate_gets_saved"] = VIEWSTATE_COUNTERS["reused"] - viewstate_before["reused"]
+        add_http_metrics(stats, http_before)
+        save_progress(job, stats)
+        db.session.commit()
+
+    print(f"Professional refresh: {stats}")
+    return stats
+
+
+def refresh_franch(job=None):
+    """Re-track pending Franch Express consignments that are due. Returns progress counts."""
+    from tracker_franch import get_fe_tracking_info_bulk
+    from http_client import http_metrics
+
+    stats = new_stats()
+    stats["unchanged"] = 0
+    http_before = http_metrics()
+    pending = due_pending(FranchExpress, stats, datetime.utcnow(), FranchExpress.updated_at)
+    if job is not None:
+        job.total = len(pending)
+        db.session.commit()
+
+    for chunk in chunked(pending, REFRESH_CHUNK):
+        tracked = get_fe_tracking_info_bulk([row.cno for row in chunk])
+        now = datetime.utcnow()
+        updates = []
+
+        for row in chunk:
+            stats["checked"] += 1
+            data = tracked.get(row.cno)
+            if not data or data.get("status") != "success":
+                stats["failed"] += 1
+                params = {"id": row.id, "next_check_at": next_check_at(row.last_status, now, failed=True)}
+            else:
+                status = data["data"].get("dl_status_txt", "")
+                # No event history for Franch Express; the schedule uses status and booking age
+                params = status_update(row, status, now, next_check_at(status, now, tdate=row.tdate))
+
+            if "last_status" not in params:
+                # Only a real status change should move updated_at (its onupdate fires otherwise)
+                params["updated_at"] = row.updated_at
+            updates.append(params)
+
+        count_changes(stats, updates)
+        bulk_update(FranchExpress, updates)
+        add_http_metrics(stats, http_before)
+        save_progress(job, stats)
+        db.session.commit()
+
+    print(f"Franch Express refresh: {stats}")
+    return stats
@@ -0,0 +1,173 @@
+"""
+Daily pending-consignments email.
+
+The scheduler (9 AM IST) and /send_daily_email queue a "daily_report" job;
+the job worker builds the report and puts it in the mail outbox (mailer.py),
+which the same worker then delivers.
+
+Pending rows are read from a server-side cursor (yield_per) as plain column
+tuples and fed into a template compiled once at import, so no per-row dicts
+or ORM objects are built. The body itself is rendered into one string, as
+the outbox stores it; what keeps it small is that each section shows at
+most REPORT_MAX_ROWS rows and sends the rest as a CSV attachment. Styling
+is a shared stylesheet rather than inline styles on every cell.
+"""
+import csv
+import io
+import os
+from datetime import datetime
+
+import pytz
+from jinja2 import Environment
+
+from models import db, Consignment, FranchExpress
+from polling import as_ist, parse_tdate
+
+IST = pytz.timezone("Asia/Kolkata")
+
+REPORT_MAX_ROWS = int(os.getenv("REPORT_MAX_ROWS", "500"))
+YIELD_PER = 1000
+
+# (title, model, attachment name)
+REPORT_SECTIONS = [
+    ("Professional Courier", Consignment, "professional_courier_pending"),
+    ("Franch Express", FranchExpress, "franch_express_pending"),
+]
+REPORT_COLUMNS = ["CNo", "T-Date", "Cnee", "Pincode", "Destination", "Weight", "Pcs",
+                  "Last Status", "Last Checked (IST)"]
+
+REPORT_HTML = """\
+<html>
+<head>
+<style>
+  .report { font-family: Arial, Helvetica, sans-serif; color: #111827; }
+  .report h2 { margin: 0 0 8px 0; }
+  .report h3 { margin: 20px 0 10px 0; }
+  .report table { border-collapse: collapse; width: 100%; font-size: 14px; background: #ffffff; border: 1px solid #e5e7eb; }
+  .report thead { background: #f9fafb; }
+  .report th { text-align: left; padding: 8px; border-bottom: 1px solid #e5e7eb; }
+  .report td { padding: 8px; border-bottom: 1px solid #f3f4f6; }
+  .report td.cno { font-weight: 600; }
+  .report .more { color: #4b5563; }
+</style>
+</head>
+<body>
+<div class="report">
+<h2>Pending Consignments Report as on {{ today }}</h2>
+{% for section in sections %}
+{% if not section.total %}
+<p><b>No pending consignments for {{ section.title }}</b></p>
+{% else %}
+<h3>{{ section.title }} (Pending: {{ section.total }})</h3>
+<table>
+<thead><tr>{% for column in columns %}<th>{{ column }}</th>{% endfor %}</tr></thead>
+<tbody>
+{% for cno, tdate, cnee, pincode, destn, wt, pcs, status, checked in section.rows() %}
+<tr><td class="cno">{{ cno }}</td><td>{{ tdate }}</td><td>{{ cnee }}</td><td>{{ pincode }}</td><td>{{ destn }}</td><td>{{ wt }}</td><td>{{ pcs }}</td><td>{{ status }}</td><td>{{ checked }}</td></tr>
+{% endfor %}
+</tbody>
+</table>
+{% if section.attached %}
+<p class="more">Showing the first {{ section.shown }} of {{ section.total }}; the other {{ section.attached }} are in the attached {{ section.filename }}.</p>
+{% endif %}
+{% endif %}
+{% if not loop.last %}
+<br/><br/>
+{% endif %}
+{% endfor %}
+</div>
+</body>
+</html>
+"""
+
+TEMPLATE = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string(REPORT_HTML)
+
+
+def report_rows(model):
+    """Formatted column tuples for the model's pending rows, streamed in id order."""
+    query = (db.session.query(model.cno, model.tdate, model.cnee, model.cpincode, model.destn,
+                              model.wt, model.pcs, model.last_status, model.last_checked)
+             .filter_by(is_delivered=False)
+             .order_by(model.id)
+             .yield_per(YIELD_PER))
+
+    # A backlog has few distinct booking dates, so each is parsed once
+    tdates = {}
+    for cno, tdate, cnee, pincode, destn, wt, pcs, status, checked in query:
+        shown = tdates.get(tdate)
+        if shown is None:
+            parsed = parse_tdate(tdate)
+            shown = tdates[tdate] = parsed.strftime("%d-%m-%Y") if parsed else (tdate or "—")
+        yield (
+            cno, shown, cnee or "—", pincode or "—", destn or "—", wt or "—", pcs or "—",
+            status or "—",
+            # last_checked is stored as naive UTC (see polling.py)
+            as_ist(checked).strftime("%d-%m-%Y %H:%M:%S") if checked else "—",
+        )
+
+
+class Section:
+    """One courier's part of the report; rows past `limit` are written to a CSV instead."""
+
+    def __init__(self, title, model, name, today_str, limit):
+        self.title = title
+        self.total = db.session.query(db.func.count(model.id)).filter_by(is_delivered=False).scalar()
+        self.model = model
+        self.limit = limit
+        self.filename = f"{name}_{today_str}.csv"
+        self.shown = 0
+        self.attached = 0
+        self.csv = self.writer = None
+
+    def rows(self):
+        for row in report_rows(self.model):
+            if self.shown < self.limit:
+                self.shown += 1
+                yield row
+                continue
+            if self.csv is None:
+                self.csv = io.StringIO()
+                self.csv.write("\ufeff")  # BOM so Excel opens it as UTF-8
+                self.writer = csv.writer(self.csv)
+                self.writer.writerow(REPORT_COLUMNS)
+            self.writer.writerow(row)
+            self.attached += 1
+
+    def attachment(self):
+        if self.csv is None:
+            return None
+        return self.filename, self.csv.getvalue().encode("utf-8"), "text/csv"
+
+
+def daily_report_email(limit=REPORT_MAX_ROWS):
+    """
+    (subject, html_body, attachments) for today's report, or None when nothing
+    is pending.
+    """
+    today_str = datetime.now(IST).strftime("%d-%m-%Y")
+    sections = [Section(title, model, name, today_str, limit) for title, model, name in REPORT_SECTIONS]
+    if not any(s.total for s in sections):
+        return None  # nothing to report
+
+    html_body = TEMPLATE.render(today=today_str, sections=sections, columns=REPORT_COLUMNS)
+    attachments = [a for a in (s.attachment() for s in sections) if a]
+    return f" Pending Consignments Report - {today_str}", html_body, attachments
+
+
+def send_daily_report(job=None):
+    """Job handler: queue today's report in the outbox."""
+    from mailer import enqueue_email
+
+    report = daily_report_email()
+    if report is None:
+        print("Daily report skipped: nothing pending")
+        if job is not None:
+            job.metrics = {"skipped": True}
+        return None
+
+    subject, html_body, attachments = report
+    email = enqueue_email(subject, html_body, attachments=attachments)
+    print(f"Daily report queued as email {email.id}")
+    if job is not None:
+        job.metrics = {"email_id": email.id, "html_bytes": len(html_body), "attachments": len(attachments)}
+    return email
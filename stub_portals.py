@@ -0,0 +1,148 @@
+"""
+Local stand-in for the two carrier portals, for exercising the tracking engine
+without hitting tpcindia.com / franchexpress.com.
+
+    python stub_portals.py --port 8099 --latency 0.2
+
+then point the trackers at it:
+
+    TPC_BASE_URL=http://127.0.0.1:8099/multiple-tracking.aspx
+    FE_TRACK_URL=http://127.0.0.1:8099/proxy.php
+
+GET /stats returns request counts and the peak number of in-flight requests
+per portal, which is what the per-carrier limits are meant to bound.
+"""
+import argparse
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+PODNO_FIELD = "ctl00$ctl00$ContentPlaceHolderBottom$ContentPlaceHolderQuickLinkBottom$podno"
+GRID_ID = "ContentPlaceHolderBottom_ContentPlaceHolderQuickLinkBottom_GridView1"
+GRID_HEADERS = ["CONSIGNMENT NO.", "Delivery Date", "Destination", "Delivery Area", "Status", "DRS No", "Stamp"]
+
+VIEWSTATE_FIELDS = """
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="stub-viewstate" />
+<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="STUBGEN" />
+"""
+FORM_PAGE = f"""<html><body><form method="post">{VIEWSTATE_FIELDS}</form></body></html>"""
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {"tpcindia": 0, "franchexpress": 0}
+        self.in_flight = {"tpcindia": 0, "franchexpress": 0}
+        self.peak = {"tpcindia": 0, "franchexpress": 0}
+
+    def enter(self, portal):
+        with self.lock:
+            self.counts[portal] += 1
+            self.in_flight[portal] += 1
+            self.peak[portal] = max(self.peak[portal], self.in_flight[portal])
+
+    def leave(self, portal):
+        with self.lock:
+            self.in_flight[portal] -= 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": dict(self.counts), "peak_in_flight": dict(self.peak)}
+
+
+def stub_status(cno):
+    # Deterministic spread of outcomes so refreshes have something to update
+    return "Delivered" if sum(map(ord, cno)) % 3 == 0 else "In Transit"
+
+
+def render_grid(numbers):
+    head = "".join(f"<th>{h}</th>" for h in GRID_HEADERS)
+    rows = []
+    for cno in numbers:
+        cells = [cno, "01/01/2026", "CHENNAI", "GUINDY", stub_status(cno), "DRS1", ""]
+        rows.append("<tr>" + "".join(f"<td>{html.escape(c)}</td>" for c in cells) + "</tr>")
+    # Like the real page, the postback response carries a fresh viewstate
+    return (f'<html><body><form method="post">{VIEWSTATE_FIELDS}'
+            f'<table id="{GRID_ID}"><tr>{head}</tr>{"".join(rows)}</table></form></body></html>')
+
+
+def make_handler(stats, latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real portals
+
+        def log_message(self, *args):
+            pass
+
+        def send_body(self, body, content_type="text/html", status=200):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length).decode("utf-8")
+
+        def do_GET(self):
+            if self.path.startswith("/stats"):
+                return self.send_body(json.dumps(stats.snapshot()), "application/json")
+            if self.path.startswith("/multiple-tracking.aspx"):
+                stats.enter("tpcindia")
+                try:
+                    time.sleep(latency)
+                    return self.send_body(FORM_PAGE)
+                finally:
+                    stats.leave("tpcindia")
+            self.send_body("not found", status=404)
+
+        def do_POST(self):
+            if self.path.startswith("/multiple-tracking.aspx"):
+                stats.enter("tpcindia")
+                try:
+                    time.sleep(latency)
+                    form = parse_qs(self.read_body())
+                    numbers = [n for n in form.get(PODNO_FIELD, [""])[0].split(",") if n]
+                    return self.send_body(render_grid(numbers))
+                finally:
+                    stats.leave("tpcindia")
+            if self.path.startswith("/proxy.php"):
+                stats.enter("franchexpress")
+                try:
+                    time.sleep(latency)
+                    awb = json.loads(self.read_body() or "{}").get("awb", "")
+                    body = {"status": "success", "data": {"awb": awb, "dl_status_txt": stub_status(awb)}}
+                    return self.send_body(json.dumps(body), "application/json")
+                finally:
+                    stats.leave("franchexpress")
+            self.send_body("not found", status=404)
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8099, latency=0.0):
+    """Start the stub in a background thread; returns (server, stats)."""
+    stats = Stats()
+    server = ThreadingHTTPServer((host, port), make_handler(stats, latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub tpcindia / franchexpress portals")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to sleep per request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(Stats(), args.latency))
+    print(f"Stub portals on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,32 @@
+import os
 import re
+import threading
 import time
 import math
 import pathlib
-import pandas as pd
+from typing import TYPE_CHECKING
+
 import requests
-from bs4 import BeautifulSoup
+
+from grid_parser import parse_results
+
+# pandas is only needed by the standalone script paths below, not by the tracker
+if TYPE_CHECKING:
+    import pandas as pd
 
 # ------------------ CONFIG ------------------
 EXCEL_PATH = r"MPK0006811.xls"   # change to your path if needed
 COLUMN_NAME = "CNo"           # the column in your Excel with consignment numbers
 PREFIX = "MAA"                   # what to prepend (e.g., "MAA")
 MAX_PER_REQUEST = 100            # site allows max 100 at a time
-BASE_URL = "https://www.tpcindia.com/multiple-tracking.aspx"
+BASE_URL = os.getenv("TPC_BASE_URL", "https://www.tpcindia.com/multiple-tracking.aspx")
 TIMEOUT = 30
+VIEWSTATE_TTL = float(os.getenv("TPC_VIEWSTATE_TTL", "600"))  # seconds a harvested viewstate is reused
 # --------------------------------------------
 
 def read_consignment_numbers(xls_path: str, column: str, prefix: str) -> list[str]:
+    import pandas as pd
+
     df = pd.read_excel(xls_path, dtype=str)  # keep as strings
     if column not in df.columns:
         raise ValueError(f"Column '{column}' not found. Available: {list(df.columns)}")
@@ -46,17 +57,56 @@ def read_consignment_numbers(xls_path: str, column: str, prefix: str) -> list[st
 def fetch_viewstate(session: requests.Session) -> dict:
     r = session.get(BASE_URL, timeout=TIMEOUT)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
-    vs = soup.select_one("#__VIEWSTATE")
-    vsg = soup.select_one("#__VIEWSTATEGENERATOR")
-    if not vs or not vsg:
+    state = parse_results(r.text).viewstate
+    if state is None:
         raise RuntimeError("Could not find __VIEWSTATE / __VIEWSTATEGENERATOR on page.")
-    return {
-        "__VIEWSTATE": vs.get("value", ""),
-        "__VIEWSTATEGENERATOR": vsg.get("value", ""),
-    }
-
-def submit_batch(session: requests.Session, numbers: list[str]) -> pd.DataFrame:
+    return state
+
+# Process-wide counters across every ViewStateCache (read by refresh jobs)
+VIEWSTATE_COUNTERS = {"fetched": 0, "reused": 0}
+_counters_lock = threading.Lock()
+
+class ViewStateCache:
+    """
+    Reuses the __VIEWSTATE / __VIEWSTATEGENERATOR pair across postbacks on one
+    session instead of GETting the page before every POST. Each POST response
+    is a full page carrying a fresh state, which is harvested for the next call.
+    """
+
+    def __init__(self, ttl: float = VIEWSTATE_TTL):
+        self.ttl = ttl
+        self.state = None
+        self.stored_at = 0.0
+
+    def get(self, session: requests.Session) -> dict:
+        if self.state is not None and time.monotonic() - self.stored_at < self.ttl:
+            with _counters_lock:
+                VIEWSTATE_COUNTERS["reused"] += 1
+            return dict(self.state)
+
+        self.store(fetch_viewstate(session))
+        with _counters_lock:
+            VIEWSTATE_COUNTERS["fetched"] += 1
+        return dict(self.state)
+
+    def store(self, state: dict) -> None:
+        self.state = state
+        self.stored_at = time.monotonic()
+
+    def harvest(self, state: dict | None) -> None:
+        if state is not None:
+            self.store(state)
+
+    def invalidate(self) -> None:
+        self.state = None
+
+def is_stale_viewstate(resp: requests.Response) -> bool:
+    # ASP.NET answers a rejected/expired state with a 500 error page
+    text = resp.text.lower()
+    return resp.status_code >= 500 and ("viewstate" in text or "state information is invalid" in text)
+
+def post_batch(session: requests.Session, numbers: list[str], cache: ViewStateCache | None = None):
+    """Run one tracking postback and return the parsed grid_parser.ResultsPage."""
 
     # ---------------------------------------
     # ✅ Your trailing comma logic applied here
@@ -71,11 +121,6 @@ def submit_batch(session: requests.Session, numbers: list[str]) -> pd.DataFrame:
         "ctl00$ctl00$ContentPlaceHolderBottom$ContentPlaceHolderQuickLinkBottom$podno": formatted,
     }
 
-    # 1) GET to capture fresh viewstate
-    vs = fetch_viewstate(session)
-    payload = payload_base | vs
-
-    # 2) POST
     headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "Origin": "https://www.tpcindia.com",
@@ -84,37 +129,48 @@ def submit_batch(session: requests.Session, numbers: list[str]) -> pd.DataFrame:
                       "AppleWebKit/537.36 (KHTML, like Gecko) "
                       "Chrome/140.0.0.0 Safari/537.36",
     }
-    resp = session.post(BASE_URL, data=payload, headers=headers, timeout=TIMEOUT)
-    resp.raise_for_status()
-
-    # 3) Parse result table
-    soup = BeautifulSoup(resp.text, "lxml")
-    table = soup.select_one("#ContentPlaceHolderBottom_ContentPlaceHolderQuickLinkBottom_GridView1")
-    if table is None:
-        err = soup.select_one("#ContentPlaceHolderBottom_ContentPlaceHolderQuickLinkBottom_Label2")
-        msg = err.get_text(strip=True) if err else "No result table found."
-        return pd.DataFrame({"Error": [msg]})
-
-    # Extract header
-    headers = [th.get_text(strip=True) for th in table.select("tr:first-child th")]
-    rows = []
-    for tr in table.select("tr")[1:]:
-        tds = tr.find_all(["td", "th"])
-        if not tds:
+
+    # With a cache, a rejected state gets one refetch-and-retry
+    attempts = 2 if cache is not None else 1
+    for attempt in range(1, attempts + 1):
+        # 1) Viewstate: cached/harvested, or a fresh GET
+        vs = cache.get(session) if cache is not None else fetch_viewstate(session)
+        payload = payload_base | vs
+
+        # 2) POST
+        resp = session.post(BASE_URL, data=payload, headers=headers, timeout=TIMEOUT)
+        if cache is not None and attempt < attempts and is_stale_viewstate(resp):
+            cache.invalidate()
             continue
-        row = [td.get_text(strip=True) for td in tds]
-        while len(row) < len(headers):
-            row.append("")
-        rows.append(row[:len(headers)])
+        resp.raise_for_status()
+
+        # 3) Parse result table
+        page = parse_results(resp.text)
+        if cache is not None:
+            if not page.found and page.message is None and attempt < attempts:
+                # Neither results nor a message: treat as a silently dropped postback
+                cache.invalidate()
+                continue
+            cache.harvest(page.viewstate)
+        break
 
-    df = pd.DataFrame(rows, columns=headers if headers else None)
-    return df
+    return page
+
+def submit_batch(session: requests.Session, numbers: list[str], cache: ViewStateCache | None = None) -> "pd.DataFrame":
+    import pandas as pd
+
+    page = post_batch(session, numbers, cache)
+    if not page.found:
+        return pd.DataFrame({"Error": [page.message if page.message is not None else "No result table found."]})
+    return pd.DataFrame(page.rows, columns=list(page.headers) if page.headers else None)
 
 def chunked(iterable, size):
     for i in range(0, len(iterable), size):
         yield iterable[i:i+size]
 
 def main():
+    import pandas as pd
+
     excel_path = pathlib.Path(EXCEL_PATH)
     if not excel_path.exists():
         raise FileNotFoundError(f"Excel file not found: {excel_path.resolve()}")
@@ -127,11 +183,12 @@ def main():
     print(f"Found {len(numbers)} consignment numbers. Submitting in batches of {MAX_PER_REQUEST}…")
     print(numbers)
     all_results = []
+    cache = ViewStateCache()
     with requests.Session() as s:
         for idx, batch in enumerate(chunked(numbers, MAX_PER_REQUEST), start=1):
             print(f"Batch {idx}: {len(batch)} numbers")
             try:
-                df = submit_batch(s, batch)
+                df = submit_batch(s, batch, cache)
                 # Tag which batch the rows came from
                 if not df.empty:
                     df.insert(0, "Batch", idx)
@@ -1,23 +1,90 @@
-from test_excel import submit_batch
+import threading
+from typing import NamedTuple
+
+import http_client
+from test_excel import post_batch, chunked, MAX_PER_REQUEST, ViewStateCache
+from tracking_engine import run_tracking
+
+# Viewstate harvested on each worker thread's session
+_local = threading.local()
+
+
+def _viewstate():
+    cache = getattr(_local, "viewstate", None)
+    if cache is None:
+        cache = _local.viewstate = ViewStateCache()
+    return cache
+
+
+class TrackingEvent(NamedTuple):
+    """One GridView row. Fields after `consignment` are in TrackingHistory.fingerprint order."""
+    consignment: str
+    delivery_date: str
+    destination: str
+    delivery_area: str
+    status: str
+    drs_no: str
+    stamp: str
+
+
+# GridView header for each TrackingEvent field
+GRID_COLUMNS = TrackingEvent(
+    consignment="CONSIGNMENT NO.",
+    delivery_date="Delivery Date",
+    destination="Destination",
+    delivery_area="Delivery Area",
+    status="Status",
+    drs_no="DRS No",
+    stamp="Stamp",
+)
+
+
+def _events(page):
+    """Grid rows as TrackingEvents; raises ValueError if the grid lacks one of the columns."""
+    if page.headers == GRID_COLUMNS:
+        return [TrackingEvent._make(row) for row in page.rows]
+    index = [page.headers.index(header) for header in GRID_COLUMNS]
+    return [TrackingEvent._make([row[i] for i in index]) for row in page.rows]
+
 
 def get_tracking_info(cno):
-    from requests import Session
-    s = Session()
-    df = submit_batch(s, [cno])
+    page = post_batch(http_client.session(), [cno])
 
-    if "Error" in df.columns:
+    if not page.found:
         return []
 
-    results = []
-    for _, row in df.iterrows():
-        results.append({
-            "Consignment": row["CONSIGNMENT NO."],
-            "Delivery Date": row["Delivery Date"],
-            "Destination": row["Destination"],
-            "Delivery Area": row["Delivery Area"],
-            "Status": row["Status"],
-            "DRS No": row["DRS No"],
-            "Stamp": row["Stamp"],
-        })
+    return _events(page)
+
+
+def track_batch(batch):
+    """Submit one postback (<= MAX_PER_REQUEST numbers) and split rows per consignment."""
+    results = {cno: [] for cno in batch}
+    page = post_batch(http_client.session(), list(batch), _viewstate())
+
+    if not page.found:
+        return results
+
+    # GridView rows for every number in the batch come back in one table
+    for event in _events(page):
+        key = event.consignment.strip().upper()
+        if key in results:
+            results[key].append(event)
+
+    return results
+
+
+def get_tracking_info_bulk(cnos):
+    """
+    Track many consignments, MAX_PER_REQUEST numbers per postback, with batches
+    fanned out over the tracking engine. Returns {cno: [TrackingEvent, ...]} in the same
+    shape as get_tracking_info(); a failed batch leaves its consignments empty.
+    """
+    cnos = [str(c).strip().upper() for c in cnos]
+    results = {cno: [] for cno in cnos}
+
+    batches = [tuple(b) for b in chunked(cnos, MAX_PER_REQUEST)]
+    for per_batch in run_tracking("tpcindia", batches, track_batch).values():
+        if per_batch:
+            results.update(per_batch)
 
     return results
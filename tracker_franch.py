@@ -1,17 +1,29 @@
-import requests
+import os
 import json
 
+import http_client
+from tracking_engine import run_tracking
+
+FE_TRACK_URL = os.getenv("FE_TRACK_URL", "https://franchexpress.com/proxy.php")
+
+
 def get_fe_tracking_info(cno):
-    url = "https://franchexpress.com/proxy.php"
+    url = FE_TRACK_URL
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/json"
     }
     payload = {"awb": cno, "captcha": ""}
 
-    res = requests.post(url, headers=headers, data=json.dumps(payload))
+    res = http_client.session().post(url, headers=headers, data=json.dumps(payload),
+                                     timeout=http_client.HTTP_TIMEOUT)
 
     if res.status_code != 200:
         return None
 
     return res.json()
+
+
+def get_fe_tracking_info_bulk(cnos):
+    """Track many Franch Express AWBs concurrently; returns {cno: response or None}."""
+    return run_tracking("franchexpress", list(dict.fromkeys(cnos)), get_fe_tracking_info)
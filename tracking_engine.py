@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Per-carrier concurrency and rate limits (requests/sec with a burst allowance).
+# Tune through env so we can push each portal as hard as it tolerates.
+CARRIERS = {
+    "tpcindia": {
+        "workers": int(os.getenv("TPC_WORKERS", "4")),
+        "rate": float(os.getenv("TPC_RATE_PER_SEC", "2")),
+        "burst": int(os.getenv("TPC_BURST", "4")),
+    },
+    "franchexpress": {
+        "workers": int(os.getenv("FE_WORKERS", "8")),
+        "rate": float(os.getenv("FE_RATE_PER_SEC", "5")),
+        "burst": int(os.getenv("FE_BURST", "10")),
+    },
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(carrier):
+    # One bucket per carrier for the whole process, shared by every refresh
+    with _buckets_lock:
+        if carrier not in _buckets:
+            cfg = CARRIERS[carrier]
+            _buckets[carrier] = TokenBucket(cfg["rate"], cfg["burst"])
+        return _buckets[carrier]
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(carrier):
+    # Worker threads live for the whole process so their per-thread sessions
+    # (and the connections/viewstate they hold) carry over between refreshes
+    with _pools_lock:
+        if carrier not in _pools:
+            _pools[carrier] = ThreadPoolExecutor(
+                max_workers=CARRIERS[carrier]["workers"],
+                thread_name_prefix=f"track-{carrier}",
+            )
+        return _pools[carrier]
+
+
+def run_tracking(carrier, items, fn):
+    """
+    Call fn(item) for every item on the carrier's bounded thread pool, rate
+    limited per carrier. Returns {item: result}; an item whose call raised maps to None.
+    """
+    items = list(items)
+    if not items:
+        return {}
+
+    bucket = get_bucket(carrier)
+
+    def call(item):
+        bucket.acquire()
+        try:
+            return fn(item)
+        except Exception as e:
+            print(f"[{carrier}] tracking call failed for {item!r}: {e}")
+            return None
+
+    return dict(zip(items, get_pool(carrier).map(call, items)))